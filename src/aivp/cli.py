@@ -4,34 +4,143 @@ from __future__ import annotations
 
 import argparse
 import json
+import sys
 from dataclasses import asdict
 from pathlib import Path
 
-from aivp.runtime.db import bootstrap_sqlite
+from aivp.config.validate import load_config_dir, validate_config_dir
+from aivp.runtime.db import bootstrap_sqlite, get_migration_version
 from aivp.runtime.daemon import DaemonRunner
+from aivp.runtime.migrations import MigrationError, MigrationRunner
+from aivp.runtime.registry import compile_agents
+from aivp.runtime.shards import (
+    LeaseStore,
+    LeaseStoreError,
+    ShardMember,
+    ShardSupervisor,
+    shard_path,
+)
 from aivp.server.app import ServerConfig, build_server_summary
 
 
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return number
+
+
 def _cmd_doctor(args: argparse.Namespace) -> int:
     config = ServerConfig(
         root_dir=Path(args.root).resolve(),
         db_path=Path(args.db_path).resolve(),
         artifacts_dir=Path(args.artifacts_dir).resolve(),
         backups_dir=Path(args.backups_dir).resolve(),
+        metrics_file=Path(args.metrics_file).resolve(),
     )
-    print(json.dumps(build_server_summary(config), indent=2))
+    summary = build_server_summary(config, include_metrics=args.metrics)
+    print(json.dumps(summary, indent=2))
     return 0
 
 
+def _lease_error(args: argparse.Namespace) -> str | None:
+    if args.lease_seconds <= args.heartbeat_seconds:
+        return (
+            f"--lease-seconds ({args.lease_seconds}) must exceed "
+            f"--heartbeat-seconds ({args.heartbeat_seconds})"
+        )
+    return None
+
+
 def _cmd_daemon_start(args: argparse.Namespace) -> int:
-    result = DaemonRunner(Path(args.pid_file).resolve()).start(
-        heartbeat_seconds=args.heartbeat_seconds,
-        max_heartbeats=args.max_heartbeats,
-    )
+    member: ShardMember | None = None
+    if args.shard_id is not None:
+        error = _lease_error(args)
+        if error is not None:
+            print(json.dumps({"error": error}, indent=2))
+            return 1
+        agents, report = load_config_dir(Path(args.agents_dir).resolve())
+        if not report.ok:
+            # fail closed: a shard must not run a partial agent set
+            payload = {
+                "error": f"refusing to start: invalid configs in {args.agents_dir}",
+                **asdict(report),
+            }
+            print(json.dumps(payload, indent=2))
+            return 1
+        try:
+            store = LeaseStore(
+                Path(args.db_path).resolve(), lease_seconds=args.lease_seconds
+            )
+        except LeaseStoreError as exc:
+            print(json.dumps({"error": str(exc)}, indent=2))
+            return 1
+        member = ShardMember(
+            store,
+            args.shard_id,
+            [record.id for record in compile_agents(agents, now=0.0).records],
+        )
+
+    try:
+        result = DaemonRunner(
+            Path(args.pid_file).resolve(),
+            metrics_file=Path(args.metrics_file).resolve(),
+            on_heartbeat=None if member is None else member.tick,
+            on_stop=None if member is None else member.leave,
+        ).start(
+            heartbeat_seconds=args.heartbeat_seconds,
+            max_heartbeats=args.max_heartbeats,
+        )
+    except Exception as exc:
+        print(json.dumps({"error": f"daemon stopped: {exc!r}"}, indent=2))
+        return 1
     print(json.dumps(asdict(result), indent=2))
     return 0 if result.status in {"started", "restart_complete"} else 1
 
 
+def _cmd_daemon_supervise(args: argparse.Namespace) -> int:
+    db_path = Path(args.db_path).resolve()
+    error = _lease_error(args)
+    if error is None and get_migration_version(db_path) is None:
+        error = f"runtime DB {db_path} is not initialized; run `db init`"
+    if error is not None:
+        print(json.dumps({"error": error}, indent=2))
+        return 1
+    pid_file = Path(args.pid_file).resolve()
+    metrics_file = Path(args.metrics_file).resolve()
+
+    def _shard_command(shard_id: str) -> list[str]:
+        return [
+            sys.executable,
+            "-m",
+            "aivp.cli",
+            "daemon",
+            "start",
+            "--shard-id",
+            shard_id,
+            "--pid-file",
+            str(shard_path(pid_file, shard_id)),
+            "--metrics-file",
+            str(shard_path(metrics_file, shard_id)),
+            "--heartbeat-seconds",
+            str(args.heartbeat_seconds),
+            "--lease-seconds",
+            str(args.lease_seconds),
+            "--agents-dir",
+            str(Path(args.agents_dir).resolve()),
+            "--db-path",
+            str(db_path),
+        ]
+
+    result = ShardSupervisor(
+        pid_file,
+        [f"shard-{index}" for index in range(args.shards)],
+        _shard_command,
+    ).run(max_polls=args.max_polls)
+    print(json.dumps(asdict(result), indent=2))
+    return 0 if result.status == "started" else 1
+
+
 def _cmd_daemon_stop(args: argparse.Namespace) -> int:
     result = DaemonRunner(Path(args.pid_file).resolve()).stop()
     print(json.dumps(asdict(result), indent=2))
@@ -39,7 +148,10 @@ def _cmd_daemon_stop(args: argparse.Namespace) -> int:
 
 
 def _cmd_daemon_restart(args: argparse.Namespace) -> int:
-    result = DaemonRunner(Path(args.pid_file).resolve()).restart(
+    result = DaemonRunner(
+        Path(args.pid_file).resolve(),
+        metrics_file=Path(args.metrics_file).resolve(),
+    ).restart(
         heartbeat_seconds=args.heartbeat_seconds,
         max_heartbeats=args.max_heartbeats,
     )
@@ -56,6 +168,34 @@ def _cmd_db_init(args: argparse.Namespace) -> int:
     return 0 if result.wal_enabled else 1
 
 
+def _cmd_db_migrate(args: argparse.Namespace) -> int:
+    runner = MigrationRunner(
+        Path(args.db_path).resolve(),
+        chunk_size=args.chunk_size,
+        pause_seconds=args.pause_seconds,
+    )
+    try:
+        if args.dry_run:
+            payload: object = [asdict(estimate) for estimate in runner.plan()]
+        else:
+            payload = asdict(runner.run(max_chunks=args.max_chunks))
+    except MigrationError as exc:
+        print(json.dumps({"error": str(exc)}, indent=2))
+        return 1
+    print(json.dumps(payload, indent=2))
+    return 0
+
+
+def _cmd_config_validate(args: argparse.Namespace) -> int:
+    report = validate_config_dir(
+        Path(args.config_dir).resolve(),
+        known_skills=args.known_skills,
+        workers=args.workers,
+    )
+    print(json.dumps(asdict(report), indent=2))
+    return 0 if report.ok else 1
+
+
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         prog="aivp",
@@ -71,6 +211,12 @@ def build_parser() -> argparse.ArgumentParser:
     doctor.add_argument("--db-path", default="runtime/db/aivp.sqlite3")
     doctor.add_argument("--artifacts-dir", default="runtime/artifacts")
     doctor.add_argument("--backups-dir", default="runtime/backups")
+    doctor.add_argument("--metrics-file", default="runtime/daemon.metrics.prom")
+    doctor.add_argument(
+        "--metrics",
+        action="store_true",
+        help="Include metrics last published by the daemon.",
+    )
     doctor.set_defaults(func=_cmd_doctor)
 
     daemon = subparsers.add_parser("daemon", help="Daemon lifecycle controls.")
@@ -81,13 +227,50 @@ def build_parser() -> argparse.ArgumentParser:
     )
     daemon_start.add_argument("--pid-file", default="runtime/daemon.pid")
     daemon_start.add_argument("--heartbeat-seconds", type=float, default=30.0)
+    daemon_start.add_argument(
+        "--metrics-file",
+        default="runtime/daemon.metrics.prom",
+        help="Path the daemon republishes Prometheus text metrics to.",
+    )
     daemon_start.add_argument(
         "--max-heartbeats",
         type=int,
         help="Maximum number of heartbeat sleep cycles before exiting.",
     )
+    daemon_start.add_argument(
+        "--shard-id",
+        help="Run as this shard, leasing its share of the agents in --agents-dir.",
+    )
+    daemon_start.add_argument("--agents-dir", default="agents")
+    daemon_start.add_argument("--db-path", default="runtime/db/aivp.sqlite3")
+    daemon_start.add_argument(
+        "--lease-seconds",
+        type=float,
+        default=90.0,
+        help="Shard agent lease period; must exceed --heartbeat-seconds.",
+    )
     daemon_start.set_defaults(func=_cmd_daemon_start)
 
+    daemon_supervise = daemon_subparsers.add_parser(
+        "supervise",
+        help="Run N sharded daemon processes and restart any that exit.",
+    )
+    daemon_supervise.add_argument("--shards", type=_positive_int, required=True)
+    daemon_supervise.add_argument("--pid-file", default="runtime/daemon.pid")
+    daemon_supervise.add_argument(
+        "--metrics-file", default="runtime/daemon.metrics.prom"
+    )
+    daemon_supervise.add_argument("--heartbeat-seconds", type=float, default=30.0)
+    daemon_supervise.add_argument("--lease-seconds", type=float, default=90.0)
+    daemon_supervise.add_argument("--agents-dir", default="agents")
+    daemon_supervise.add_argument("--db-path", default="runtime/db/aivp.sqlite3")
+    daemon_supervise.add_argument(
+        "--max-polls",
+        type=int,
+        help="Maximum number of supervision polls before stopping the shards.",
+    )
+    daemon_supervise.set_defaults(func=_cmd_daemon_supervise)
+
     daemon_stop = daemon_subparsers.add_parser("stop", help="Stop daemon by pid file.")
     daemon_stop.add_argument("--pid-file", default="runtime/daemon.pid")
     daemon_stop.set_defaults(func=_cmd_daemon_stop)
@@ -97,6 +280,11 @@ def build_parser() -> argparse.ArgumentParser:
     )
     daemon_restart.add_argument("--pid-file", default="runtime/daemon.pid")
     daemon_restart.add_argument("--heartbeat-seconds", type=float, default=30.0)
+    daemon_restart.add_argument(
+        "--metrics-file",
+        default="runtime/daemon.metrics.prom",
+        help="Path the daemon republishes Prometheus text metrics to.",
+    )
     daemon_restart.add_argument(
         "--max-heartbeats",
         type=int,
@@ -104,6 +292,27 @@ def build_parser() -> argparse.ArgumentParser:
     )
     daemon_restart.set_defaults(func=_cmd_daemon_restart)
 
+    config = subparsers.add_parser("config", help="Agent config operations.")
+    config_subparsers = config.add_subparsers(dest="config_command", required=True)
+
+    config_validate = config_subparsers.add_parser(
+        "validate",
+        help="Validate every agent YAML in a directory and report all errors.",
+    )
+    config_validate.add_argument("config_dir")
+    config_validate.add_argument(
+        "--known-skill",
+        dest="known_skills",
+        action="append",
+        help="Registered skill name; repeat to enable unknown-skill checks.",
+    )
+    config_validate.add_argument(
+        "--workers",
+        type=int,
+        help="Parser processes (defaults to the CPU count).",
+    )
+    config_validate.set_defaults(func=_cmd_config_validate)
+
     db = subparsers.add_parser("db", help="Runtime database operations.")
     db_subparsers = db.add_subparsers(dest="db_command", required=True)
 
@@ -115,6 +324,30 @@ def build_parser() -> argparse.ArgumentParser:
     db_init.add_argument("--migration-version", default="v1alpha1")
     db_init.set_defaults(func=_cmd_db_init)
 
+    db_migrate = db_subparsers.add_parser(
+        "migrate",
+        help="Apply pending runtime DB migrations in resumable chunks.",
+    )
+    db_migrate.add_argument("--db-path", default="runtime/db/aivp.sqlite3")
+    db_migrate.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Estimate pending row counts and time without changing the DB.",
+    )
+    db_migrate.add_argument("--chunk-size", type=_positive_int, default=1000)
+    db_migrate.add_argument(
+        "--pause-seconds",
+        type=float,
+        default=0.0,
+        help="Sleep between backfill chunks to yield to the daemon's writers.",
+    )
+    db_migrate.add_argument(
+        "--max-chunks",
+        type=_positive_int,
+        help="Stop after this many backfill chunks; rerun to resume.",
+    )
+    db_migrate.set_defaults(func=_cmd_db_migrate)
+
     return parser
 
 
@@ -18,6 +18,12 @@ class TriggerConfig(BaseModel):
     every_minutes: int = Field(default=10, ge=1, le=10080)
 
 
+class ProfilingConfig(BaseModel):
+    enabled: bool = False
+    slow_run_seconds: float = Field(default=30.0, gt=0)
+    sample_interval_ms: float = Field(default=10.0, ge=1, le=1000)
+
+
 class AgentConfig(BaseModel):
     schema_version: str = "v1alpha1"
     id: str = Field(min_length=1)
@@ -25,4 +31,6 @@ class AgentConfig(BaseModel):
     timezone: str = "UTC"
     trigger: TriggerConfig
     steps: list[StepRef] = Field(default_factory=list)
+    includes: list[str] = Field(default_factory=list)
+    profiling: ProfilingConfig = Field(default_factory=ProfilingConfig)
     created_at: datetime | None = None
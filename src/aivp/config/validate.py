@@ -0,0 +1,288 @@
+"""Batch validation of agent YAML config directories."""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import yaml
+from pydantic import TypeAdapter, ValidationError
+
+from aivp.config.models import AgentConfig
+
+YAML_SUFFIXES = (".yaml", ".yml")
+
+# libyaml-backed loader when PyYAML was built with it
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+_AGENT_LIST_ADAPTER = TypeAdapter(list[AgentConfig])
+
+
+@dataclass(frozen=True)
+class ConfigError:
+    file: str
+    loc: list[str | int]
+    type: str
+    msg: str
+
+
+@dataclass
+class ValidationReport:
+    files: int = 0
+    valid: int = 0
+    errors: list[ConfigError] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+@dataclass(frozen=True)
+class _Loaded:
+    path: str
+    document: object = None
+    error: str | None = None
+
+
+def discover_config_files(config_dir: Path) -> list[Path]:
+    return sorted(
+        path
+        for path in config_dir.rglob("*")
+        if path.suffix in YAML_SUFFIXES and path.is_file()
+    )
+
+
+def _load_batch(paths: list[str]) -> list[_Loaded]:
+    loaded: list[_Loaded] = []
+    for path in paths:
+        try:
+            with open(path, encoding="utf-8") as handle:
+                loaded.append(_Loaded(path, yaml.load(handle, Loader=_YAML_LOADER)))
+        except (OSError, yaml.YAMLError) as exc:
+            loaded.append(_Loaded(path, error=str(exc)))
+    return loaded
+
+
+def _batches(items: list[str], size: int) -> Iterable[list[str]]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def _load_config_files(
+    paths: list[Path],
+    workers: int | None = None,
+    batch_size: int = 64,
+) -> list[_Loaded]:
+    """Parse YAML files, fanning batches out over a process pool."""
+    names = [str(path) for path in paths]
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(names) <= batch_size:
+        return _load_batch(names)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [
+            loaded
+            for batch in pool.map(_load_batch, _batches(names, batch_size))
+            for loaded in batch
+        ]
+
+
+def _validate_batch(
+    batch: list[_Loaded], errors: list[ConfigError]
+) -> list[tuple[str, AgentConfig]]:
+    documents = [loaded.document for loaded in batch]
+    try:
+        agents = _AGENT_LIST_ADAPTER.validate_python(documents)
+    except ValidationError as exc:
+        failed: set[int] = set()
+        for error in exc.errors():
+            index, *loc = error["loc"]
+            failed.add(int(index))
+            errors.append(
+                ConfigError(
+                    file=batch[int(index)].path,
+                    loc=list(loc),
+                    type=error["type"],
+                    msg=error["msg"],
+                )
+            )
+        batch = [loaded for i, loaded in enumerate(batch) if i not in failed]
+        agents = _AGENT_LIST_ADAPTER.validate_python(
+            [loaded.document for loaded in batch]
+        )
+    return [(loaded.path, agent) for loaded, agent in zip(batch, agents)]
+
+
+def _document_includes(document: object) -> list[str]:
+    includes = document.get("includes") if isinstance(document, dict) else None
+    if not isinstance(includes, list):
+        return []
+    return [include for include in includes if isinstance(include, str)]
+
+
+def _check_includes(documents: list[_Loaded], errors: list[ConfigError]) -> None:
+    """Report missing includes and include cycles across parsed documents.
+
+    The graph is built from raw documents, so schema-invalid files still
+    contribute their edges and cycles through them are found. Every file on
+    a cycle gets its own `include_cycle` error.
+    """
+    graph: dict[str, list[str]] = {}
+    files: dict[str, str] = {}
+    for loaded in documents:
+        node = str(Path(loaded.path).resolve())
+        files[node] = loaded.path
+        targets: list[str] = []
+        for position, include in enumerate(_document_includes(loaded.document)):
+            target = Path(loaded.path).parent / include
+            if not target.is_file():
+                errors.append(
+                    ConfigError(
+                        file=loaded.path,
+                        loc=["includes", position],
+                        type="include_not_found",
+                        msg=f"included file {include!r} does not exist",
+                    )
+                )
+                continue
+            targets.append(str(target.resolve()))
+        graph[node] = targets
+
+    # iterative three-colour DFS; each back edge closes one cycle
+    visiting, done = 1, 2
+    state: dict[str, int] = {}
+    reported: set[frozenset[str]] = set()
+    for root in graph:
+        if root in state:
+            continue
+        stack: list[tuple[str, Iterable[str]]] = [(root, iter(graph[root]))]
+        trail = [root]
+        state[root] = visiting
+        while stack:
+            node, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                trail.pop()
+                state[node] = done
+            elif state.get(child) == visiting:
+                members = trail[trail.index(child) :]
+                if frozenset(members) in reported:
+                    continue
+                reported.add(frozenset(members))
+                for offset, member in enumerate(members):
+                    cycle = members[offset:] + members[:offset] + [member]
+                    errors.append(
+                        ConfigError(
+                            file=files.get(member, member),
+                            loc=["includes"],
+                            type="include_cycle",
+                            msg="include cycle: " + " -> ".join(cycle),
+                        )
+                    )
+            elif child not in state:
+                state[child] = visiting
+                trail.append(child)
+                stack.append((child, iter(graph.get(child, ()))))
+
+
+def _check_cross_agent(
+    agents: list[tuple[str, AgentConfig]],
+    known_skills: frozenset[str] | None,
+    errors: list[ConfigError],
+) -> None:
+    files_by_id: dict[str, list[str]] = {}
+    for path, agent in agents:
+        files_by_id.setdefault(agent.id, []).append(path)
+    for agent_id, paths in files_by_id.items():
+        if len(paths) < 2:
+            continue
+        for path in paths:
+            others = ", ".join(other for other in paths if other != path)
+            errors.append(
+                ConfigError(
+                    file=path,
+                    loc=["id"],
+                    type="duplicate_id",
+                    msg=f"agent id {agent_id!r} is also defined in {others}",
+                )
+            )
+
+    if known_skills is None:
+        return
+    for path, agent in agents:
+        for position, step in enumerate(agent.steps):
+            if step.skill not in known_skills:
+                errors.append(
+                    ConfigError(
+                        file=path,
+                        loc=["steps", position, "skill"],
+                        type="unknown_skill",
+                        msg=f"skill {step.skill!r} is not registered",
+                    )
+                )
+
+
+def load_config_dir(
+    config_dir: Path,
+    known_skills: Iterable[str] | None = None,
+    workers: int | None = None,
+    batch_size: int = 64,
+) -> tuple[list[AgentConfig], ValidationReport]:
+    """Validate every agent YAML under `config_dir` and collect all errors.
+
+    Files are parsed in parallel and validated in batches through one
+    `TypeAdapter(list[AgentConfig])`. Cross-agent checks (duplicate ids,
+    unknown skills when `known_skills` is given) run over indexes built once
+    from the valid configs; missing or cyclic `includes` are checked across
+    every parsed file.
+    Returns the configs of files without errors alongside the report.
+    """
+    paths = discover_config_files(config_dir.resolve())
+    report = ValidationReport(files=len(paths))
+    loaded = _load_config_files(paths, workers=workers, batch_size=batch_size)
+
+    parsed: list[_Loaded] = []
+    for item in loaded:
+        if item.error is not None:
+            report.errors.append(
+                ConfigError(file=item.path, loc=[], type="yaml_error", msg=item.error)
+            )
+        else:
+            parsed.append(item)
+
+    agents: list[tuple[str, AgentConfig]] = []
+    for start in range(0, len(parsed), batch_size):
+        agents.extend(
+            _validate_batch(parsed[start : start + batch_size], report.errors)
+        )
+
+    _check_includes(parsed, report.errors)
+    _check_cross_agent(
+        agents,
+        None if known_skills is None else frozenset(known_skills),
+        report.errors,
+    )
+
+    invalid_files = {error.file for error in report.errors}
+    report.valid = sum(1 for path in paths if str(path) not in invalid_files)
+    valid_agents = [agent for path, agent in agents if path not in invalid_files]
+    return valid_agents, report
+
+
+def validate_config_dir(
+    config_dir: Path,
+    known_skills: Iterable[str] | None = None,
+    workers: int | None = None,
+    batch_size: int = 64,
+) -> ValidationReport:
+    """Return the `load_config_dir` report for `config_dir`."""
+    _, report = load_config_dir(
+        config_dir,
+        known_skills=known_skills,
+        workers=workers,
+        batch_size=batch_size,
+    )
+    return report
@@ -4,11 +4,20 @@ from __future__ import annotations
 
 import os
 import signal
+import threading
 import time
+from collections.abc import Callable
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Literal
 
+from aivp.runtime.metrics import (
+    DAEMON_HEARTBEATS,
+    DAEMON_LOOP_LAG_SECONDS,
+    REGISTRY,
+    write_textfile,
+)
+
 
 class PidLockError(RuntimeError):
     """Raised when a daemon lock cannot be acquired."""
@@ -104,8 +113,26 @@ class DaemonActionResult:
 class DaemonRunner:
     """Foreground daemon runner that holds the PID lock for its lifetime."""
 
-    def __init__(self, pid_file: Path) -> None:
+    def __init__(
+        self,
+        pid_file: Path,
+        metrics_file: Path | None = None,
+        on_heartbeat: Callable[[], object] | None = None,
+        on_stop: Callable[[], object] | None = None,
+    ) -> None:
         self.pid_file = pid_file
+        self.metrics_file = metrics_file
+        self.on_heartbeat = on_heartbeat
+        self.on_stop = on_stop
+
+    def _heartbeat(self) -> None:
+        if self.on_heartbeat is not None:
+            self.on_heartbeat()
+        self._publish_metrics()
+
+    def _publish_metrics(self) -> None:
+        if self.metrics_file is not None:
+            write_textfile(REGISTRY, self.metrics_file)
 
     def start(
         self,
@@ -115,6 +142,11 @@ class DaemonRunner:
         """Run daemon heartbeat loop in foreground.
 
         `max_heartbeats` is the maximum number of sleep cycles to execute.
+        `on_heartbeat` runs once at startup and after every sleep cycle.
+        `on_stop` runs while the PID lock is still held, whenever the loop
+        ends, including when `on_heartbeat` raises.
+        When `metrics_file` is set, metrics are republished there after
+        every heartbeat in Prometheus text format.
         """
         lock = PidFileLock(self.pid_file)
         try:
@@ -127,11 +159,11 @@ class DaemonRunner:
                 pid=existing_pid,
             )
 
-        running = True
+        # set by the signal handler so a stop interrupts the heartbeat wait
+        stopping = threading.Event()
 
         def _handle_signal(_signum: int, _frame: object) -> None:
-            nonlocal running
-            running = False
+            stopping.set()
 
         old_sigint = signal.signal(signal.SIGINT, _handle_signal)
         has_sigterm = hasattr(signal, "SIGTERM")
@@ -141,16 +173,27 @@ class DaemonRunner:
 
         try:
             beats = 0
-            while running:
+            sleep_seconds = max(heartbeat_seconds, 0.01)
+            self._heartbeat()
+            while not stopping.is_set():
                 if max_heartbeats is not None and beats >= max_heartbeats:
                     break
-                time.sleep(max(heartbeat_seconds, 0.01))
+                scheduled = time.monotonic() + sleep_seconds
+                if stopping.wait(sleep_seconds):
+                    break
+                DAEMON_LOOP_LAG_SECONDS.observe(max(time.monotonic() - scheduled, 0.0))
+                DAEMON_HEARTBEATS.inc()
                 beats += 1
+                self._heartbeat()
         finally:
-            if old_sigterm is not None:
-                signal.signal(signal.SIGTERM, old_sigterm)
-            signal.signal(signal.SIGINT, old_sigint)
-            lock.release()
+            try:
+                if self.on_stop is not None:
+                    self.on_stop()
+            finally:
+                if old_sigterm is not None:
+                    signal.signal(signal.SIGTERM, old_sigterm)
+                signal.signal(signal.SIGINT, old_sigint)
+                lock.release()
 
         return DaemonActionResult(
             status="started",
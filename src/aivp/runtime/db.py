@@ -1,4 +1,4 @@
-"""SQLite bootstrap and migration-version helpers."""
+"""SQLite bootstrap, migration-version, and run trace helpers."""
 
 from __future__ import annotations
 
@@ -6,11 +6,32 @@ import sqlite3
 from dataclasses import dataclass
 from pathlib import Path
 
+from aivp.runtime.metrics import DB_TRANSACTION_SECONDS
+
 SCHEMA_STATE_TABLE_DDL = """
 CREATE TABLE IF NOT EXISTS schema_state (
     id INTEGER PRIMARY KEY CHECK (id = 1),
     migration_version TEXT NOT NULL,
-    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    migration_step TEXT,
+    migration_cursor INTEGER
+)
+"""
+
+# columns added after the initial schema_state layout, with their DDL types
+SCHEMA_STATE_ADDED_COLUMNS = {
+    "migration_step": "TEXT",
+    "migration_cursor": "INTEGER",
+}
+
+RUN_TRACES_TABLE_DDL = """
+CREATE TABLE IF NOT EXISTS run_traces (
+    run_id TEXT PRIMARY KEY,
+    agent_id TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    duration_seconds REAL NOT NULL,
+    status TEXT NOT NULL,
+    profile_artifact TEXT
 )
 """
 
@@ -24,7 +45,8 @@ class DbBootstrapResult:
     created_state_row: bool
 
 
-def _connect(db_path: Path) -> sqlite3.Connection:
+def connect(db_path: Path) -> sqlite3.Connection:
+    """Open the runtime DB at `db_path`, creating its directory if needed."""
     db_path.parent.mkdir(parents=True, exist_ok=True)
     return sqlite3.connect(db_path)
 
@@ -33,8 +55,17 @@ def _normalize_journal_mode(mode: str) -> str:
     return mode.strip().lower()
 
 
-def _ensure_schema_state_table(conn: sqlite3.Connection) -> None:
+def ensure_schema_state_table(conn: sqlite3.Connection) -> None:
+    """Create `schema_state`, adding columns missing from older layouts."""
     conn.execute(SCHEMA_STATE_TABLE_DDL)
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(schema_state)")}
+    for column, column_type in SCHEMA_STATE_ADDED_COLUMNS.items():
+        if column not in existing:
+            conn.execute(f"ALTER TABLE schema_state ADD COLUMN {column} {column_type}")
+
+
+def _ensure_run_traces_table(conn: sqlite3.Connection) -> None:
+    conn.execute(RUN_TRACES_TABLE_DDL)
 
 
 def bootstrap_sqlite(
@@ -42,12 +73,12 @@ def bootstrap_sqlite(
     initial_migration_version: str = "v1alpha1",
 ) -> DbBootstrapResult:
     """Initialize SQLite runtime DB, WAL mode, and migration state table."""
-    with _connect(db_path) as conn:
+    with connect(db_path) as conn, DB_TRANSACTION_SECONDS.time():
         conn.execute("PRAGMA journal_mode=WAL")
         conn.execute("PRAGMA synchronous=NORMAL")
         conn.execute("PRAGMA foreign_keys=ON")
 
-        _ensure_schema_state_table(conn)
+        ensure_schema_state_table(conn)
 
         created_state_row = False
         cursor = conn.execute(
@@ -88,7 +119,7 @@ def get_migration_version(db_path: Path) -> str | None:
     if not db_path.exists():
         return None
 
-    with _connect(db_path) as conn:
+    with connect(db_path) as conn:
         try:
             row = conn.execute(
                 "SELECT migration_version FROM schema_state WHERE id = 1"
@@ -104,8 +135,8 @@ def get_migration_version(db_path: Path) -> str | None:
 
 
 def set_migration_version(db_path: Path, migration_version: str) -> None:
-    with _connect(db_path) as conn:
-        _ensure_schema_state_table(conn)
+    with connect(db_path) as conn, DB_TRANSACTION_SECONDS.time():
+        ensure_schema_state_table(conn)
         conn.execute(
             """
             INSERT INTO schema_state (id, migration_version)
@@ -117,3 +148,62 @@ def set_migration_version(db_path: Path, migration_version: str) -> None:
             (migration_version,),
         )
         conn.commit()
+
+
+@dataclass(frozen=True)
+class RunTrace:
+    run_id: str
+    agent_id: str
+    started_at: str
+    duration_seconds: float
+    status: str
+    profile_artifact: str | None = None
+
+
+def record_run_trace(db_path: Path, trace: RunTrace) -> None:
+    """Insert or replace the trace row for `trace.run_id`."""
+    with connect(db_path) as conn, DB_TRANSACTION_SECONDS.time():
+        _ensure_run_traces_table(conn)
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO run_traces (
+                run_id, agent_id, started_at, duration_seconds, status,
+                profile_artifact
+            )
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (
+                trace.run_id,
+                trace.agent_id,
+                trace.started_at,
+                trace.duration_seconds,
+                trace.status,
+                trace.profile_artifact,
+            ),
+        )
+        conn.commit()
+
+
+def get_run_trace(db_path: Path, run_id: str) -> RunTrace | None:
+    if not db_path.exists():
+        return None
+
+    with connect(db_path) as conn:
+        try:
+            row = conn.execute(
+                """
+                SELECT run_id, agent_id, started_at, duration_seconds, status,
+                       profile_artifact
+                FROM run_traces
+                WHERE run_id = ?
+                """,
+                (run_id,),
+            ).fetchone()
+        except sqlite3.OperationalError as exc:
+            if "no such table: run_traces" in str(exc):
+                return None
+            raise
+
+        if row is None:
+            return None
+        return RunTrace(*row)
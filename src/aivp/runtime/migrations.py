@@ -0,0 +1,354 @@
+"""Ordered, resumable runtime DB migrations.
+
+Each `MigrationStep` applies its schema statements in one short transaction
+and then, if it has a `Backfill`, updates existing rows in rowid-ordered
+chunks. Every chunk commits together with a checkpoint in `schema_state`
+(`migration_step`, `migration_cursor`), so an interrupted run resumes from
+the last committed chunk. Backfills hold the write lock for one chunk at a
+time; schema statements hold it until they finish, so an index build on a
+large table blocks the daemon's writers for the whole build.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from aivp.runtime.db import RUN_TRACES_TABLE_DDL, ensure_schema_state_table
+from aivp.runtime.metrics import DB_TRANSACTION_SECONDS
+
+BASELINE_VERSION = "v1alpha1"
+
+
+class MigrationError(RuntimeError):
+    """Raised when the DB state does not match the known migration steps."""
+
+
+@dataclass(frozen=True)
+class Backfill:
+    """Chunked data update over `table`.
+
+    `update_sql` is executed once per chunk with `(low_rowid, high_rowid)`
+    parameters and must restrict itself to `rowid > ? AND rowid <= ?`.
+    """
+
+    table: str
+    update_sql: str
+
+
+@dataclass(frozen=True)
+class MigrationStep:
+    """One schema version.
+
+    `scan_tables` names the tables whose rows the statements read in full
+    (index builds, table rebuilds); dry runs size the statements from them.
+    """
+
+    version: str
+    description: str
+    statements: tuple[str, ...] = ()
+    backfill: Backfill | None = None
+    scan_tables: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class MigrationEstimate:
+    version: str
+    description: str
+    statements: int
+    scan_rows: int
+    backfill_rows: int
+    backfill_chunks: int
+    estimated_seconds: float
+
+
+@dataclass(frozen=True)
+class MigrationRunResult:
+    from_version: str
+    to_version: str
+    applied: list[str] = field(default_factory=list)
+    chunks: int = 0
+    complete: bool = True
+
+
+RUNTIME_MIGRATIONS: tuple[MigrationStep, ...] = (
+    MigrationStep(
+        version="v1alpha2",
+        description="index run traces by agent and start time",
+        statements=(
+            RUN_TRACES_TABLE_DDL,
+            """
+            CREATE INDEX IF NOT EXISTS run_traces_agent_started_idx
+            ON run_traces (agent_id, started_at)
+            """,
+        ),
+        scan_tables=("run_traces",),
+    ),
+)
+
+
+@dataclass(frozen=True)
+class _State:
+    version: str
+    step: str | None
+    cursor: int
+
+
+class MigrationRunner:
+    """Apply `steps` in order to the runtime DB at `db_path`."""
+
+    def __init__(
+        self,
+        db_path: Path,
+        steps: tuple[MigrationStep, ...] = RUNTIME_MIGRATIONS,
+        chunk_size: int = 1000,
+        pause_seconds: float = 0.0,
+        busy_timeout_ms: int = 5000,
+    ) -> None:
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        versions = [step.version for step in steps]
+        if len(set(versions)) != len(versions) or BASELINE_VERSION in versions:
+            raise ValueError("migration versions must be unique and not baseline")
+        self.db_path = db_path
+        self.steps = steps
+        self.chunk_size = chunk_size
+        self.pause_seconds = pause_seconds
+        self.busy_timeout_ms = busy_timeout_ms
+
+    def _open(self) -> sqlite3.Connection:
+        # never create the DB here: a dry run must leave a missing path alone
+        if not self.db_path.is_file():
+            raise MigrationError(
+                f"runtime DB {self.db_path} does not exist; run `db init`"
+            )
+        conn = sqlite3.connect(self.db_path)
+        # explicit BEGIN/COMMIT so DDL and checkpoints share a transaction
+        conn.isolation_level = None
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        return conn
+
+    def _read_state(self, conn: sqlite3.Connection) -> _State:
+        # legacy tables may predate the checkpoint columns
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(schema_state)")}
+        row = None
+        if columns:
+            step = "migration_step" if "migration_step" in columns else "NULL"
+            cursor = "migration_cursor" if "migration_cursor" in columns else "NULL"
+            row = conn.execute(
+                f"SELECT migration_version, {step}, {cursor} "
+                "FROM schema_state WHERE id = 1"
+            ).fetchone()
+        if row is None:
+            raise MigrationError("schema_state is not initialized; run `db init`")
+        return _State(version=str(row[0]), step=row[1], cursor=int(row[2] or 0))
+
+    def _pending(self, state: _State) -> list[MigrationStep]:
+        if state.version == BASELINE_VERSION:
+            return list(self.steps)
+        for index, step in enumerate(self.steps):
+            if step.version == state.version:
+                return list(self.steps[index + 1 :])
+        raise MigrationError(f"unknown migration version {state.version!r}")
+
+    def _next_upper(
+        self, conn: sqlite3.Connection, backfill: Backfill, cursor: int
+    ) -> int | None:
+        row = conn.execute(
+            f"""
+            SELECT MAX(rowid) FROM (
+                SELECT rowid FROM {backfill.table}
+                WHERE rowid > ? ORDER BY rowid LIMIT ?
+            )
+            """,
+            (cursor, self.chunk_size),
+        ).fetchone()
+        return None if row is None or row[0] is None else int(row[0])
+
+    def _checkpoint(
+        self, conn: sqlite3.Connection, step: str | None, cursor: int | None
+    ) -> None:
+        conn.execute(
+            """
+            UPDATE schema_state
+            SET migration_step = ?, migration_cursor = ?
+            WHERE id = 1
+            """,
+            (step, cursor),
+        )
+
+    def _table_exists(self, conn: sqlite3.Connection, table: str) -> bool:
+        row = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+            (table,),
+        ).fetchone()
+        return row is not None
+
+    def _read_cost(
+        self, conn: sqlite3.Connection, table: str, cursor: int
+    ) -> tuple[int, float]:
+        """Return rows after `cursor` and the time to read them, from one chunk.
+
+        Only a bounded read of one chunk is timed; its per-row time is
+        extrapolated over the remaining rows.
+        """
+        if not self._table_exists(conn, table):
+            return 0, 0.0
+        rows = conn.execute(
+            f"SELECT COUNT(*) FROM {table} WHERE rowid > ?", (cursor,)
+        ).fetchone()[0]
+        if not rows:
+            return 0, 0.0
+        started = time.perf_counter()
+        sampled = len(
+            conn.execute(
+                f"SELECT * FROM {table} WHERE rowid > ? ORDER BY rowid LIMIT ?",
+                (cursor, self.chunk_size),
+            ).fetchall()
+        )
+        sample = time.perf_counter() - started
+        return rows, sample / max(sampled, 1) * rows
+
+    def plan(self) -> list[MigrationEstimate]:
+        """Estimate pending steps without changing the DB (dry run).
+
+        The plan only reads, inside one deferred transaction, so it never
+        takes the write lock or blocks the daemon's writers. Statement cost
+        is sized from the row counts of `scan_tables` and backfill cost from
+        the remaining rows, each timed by reading one sample chunk. A missing
+        DB raises `MigrationError` without being created.
+        """
+        conn = self._open()
+        try:
+            estimates: list[MigrationEstimate] = []
+            conn.execute("BEGIN")
+            try:
+                state = self._read_state(conn)
+                for step in self._pending(state):
+                    resuming = state.step == step.version
+                    elapsed = 0.0
+                    scan_rows = 0
+                    if not resuming:
+                        for table in step.scan_tables:
+                            rows, seconds = self._read_cost(conn, table, 0)
+                            scan_rows += rows
+                            elapsed += seconds
+
+                    rows = chunks = 0
+                    if step.backfill is not None:
+                        cursor = state.cursor if resuming else 0
+                        rows, seconds = self._read_cost(
+                            conn, step.backfill.table, cursor
+                        )
+                        chunks = -(-rows // self.chunk_size)
+                        elapsed += seconds
+                        elapsed += self.pause_seconds * max(chunks - 1, 0)
+
+                    estimates.append(
+                        MigrationEstimate(
+                            version=step.version,
+                            description=step.description,
+                            statements=0 if resuming else len(step.statements),
+                            scan_rows=scan_rows,
+                            backfill_rows=rows,
+                            backfill_chunks=chunks,
+                            estimated_seconds=elapsed,
+                        )
+                    )
+            finally:
+                conn.execute("ROLLBACK")
+            return estimates
+        finally:
+            conn.close()
+
+    def run(self, max_chunks: int | None = None) -> MigrationRunResult:
+        """Apply pending steps, stopping early after `max_chunks` chunks.
+
+        A run stopped by `max_chunks` (or interrupted) leaves a checkpoint
+        and the next call resumes the in-progress backfill.
+        """
+        conn = self._open()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # read first so an uninitialized DB is refused untouched
+                state = self._read_state(conn)
+                ensure_schema_state_table(conn)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            from_version = state.version
+            applied: list[str] = []
+            chunks = 0
+
+            for step in self._pending(state):
+                cursor = state.cursor if state.step == step.version else None
+                if cursor is None:
+                    conn.execute("BEGIN IMMEDIATE")
+                    try:
+                        with DB_TRANSACTION_SECONDS.time():
+                            for statement in step.statements:
+                                conn.execute(statement)
+                            self._checkpoint(conn, step.version, 0)
+                    except BaseException:
+                        conn.execute("ROLLBACK")
+                        raise
+                    conn.execute("COMMIT")
+                    cursor = 0
+
+                if step.backfill is not None:
+                    while True:
+                        if max_chunks is not None and chunks >= max_chunks:
+                            return MigrationRunResult(
+                                from_version=from_version,
+                                to_version=self._read_state(conn).version,
+                                applied=applied,
+                                chunks=chunks,
+                                complete=False,
+                            )
+                        conn.execute("BEGIN IMMEDIATE")
+                        try:
+                            with DB_TRANSACTION_SECONDS.time():
+                                upper = self._next_upper(conn, step.backfill, cursor)
+                                if upper is not None:
+                                    conn.execute(
+                                        step.backfill.update_sql, (cursor, upper)
+                                    )
+                                    self._checkpoint(conn, step.version, upper)
+                        except BaseException:
+                            conn.execute("ROLLBACK")
+                            raise
+                        conn.execute("COMMIT")
+                        if upper is None:
+                            break
+                        cursor = upper
+                        chunks += 1
+                        if self.pause_seconds > 0:
+                            time.sleep(self.pause_seconds)
+
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute(
+                    """
+                    UPDATE schema_state
+                    SET migration_version = ?,
+                        migration_step = NULL,
+                        migration_cursor = NULL,
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE id = 1
+                    """,
+                    (step.version,),
+                )
+                conn.execute("COMMIT")
+                applied.append(step.version)
+
+            return MigrationRunResult(
+                from_version=from_version,
+                to_version=self._read_state(conn).version,
+                applied=applied,
+                chunks=chunks,
+            )
+        finally:
+            conn.close()
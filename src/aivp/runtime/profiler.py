@@ -0,0 +1,91 @@
+"""Thread-based sampling profiler producing collapsed-stack output."""
+
+from __future__ import annotations
+
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+
+
+def _frame_label(frame: FrameType) -> str:
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{frame.f_code.co_qualname}"
+
+
+def _collapse(frame: FrameType | None) -> str:
+    labels: list[str] = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return ";".join(labels)
+
+
+class SamplingProfiler:
+    """Periodically sample one thread's stack from a background thread.
+
+    Samples are aggregated into collapsed stacks (`root;...;leaf count`),
+    the input format of flamegraph tools. A sampler thread is used instead of
+    `SIGPROF` so the profiled code does not have to run on the main thread.
+    """
+
+    def __init__(
+        self,
+        thread_id: int | None = None,
+        interval_seconds: float = 0.01,
+    ) -> None:
+        self.thread_id = thread_id
+        self.interval_seconds = max(interval_seconds, 0.001)
+        self.stacks: Counter[str] = Counter()
+        self.sample_count = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            raise RuntimeError("profiler already started")
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name="aivp-sampling-profiler",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            self.sample()
+
+    def sample(self) -> None:
+        """Record the target thread's current stack once."""
+        frame = sys._current_frames().get(self.thread_id)  # type: ignore[arg-type]
+        if frame is None:
+            return
+        self.stacks[_collapse(frame)] += 1
+        self.sample_count += 1
+
+    def collapsed_lines(self) -> list[str]:
+        return [f"{stack} {count}" for stack, count in self.stacks.most_common()]
+
+    def write_collapsed(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        text = "\n".join(self.collapsed_lines())
+        path.write_text(text + "\n" if text else "", encoding="utf-8")
+
+    def __enter__(self) -> SamplingProfiler:
+        self.start()
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.stop()
@@ -0,0 +1,129 @@
+"""Compact runtime representation of validated agent configs."""
+
+from __future__ import annotations
+
+import math
+import sys
+from array import array
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from aivp.config.models import AgentConfig
+
+
+@dataclass(frozen=True, slots=True)
+class StepRecord:
+    id: str
+    skill: str
+
+
+@dataclass(frozen=True, slots=True)
+class ProfilingRecord:
+    enabled: bool
+    slow_run_seconds: float
+    sample_interval_ms: float
+
+
+@dataclass(frozen=True, slots=True)
+class AgentRecord:
+    id: str
+    name: str
+    timezone: str
+    trigger_type: str
+    steps: tuple[StepRecord, ...]
+    profiling: ProfilingRecord
+    includes: tuple[str, ...] = ()
+
+
+class AgentRegistry:
+    """Slotted agent records plus array-backed trigger scheduling state.
+
+    Record `i` fires every `intervals[i]` seconds and is next due at
+    `next_fire[i]` (seconds on the caller's clock). Event-triggered agents
+    have an infinite next-fire time and are never returned by `due`.
+    """
+
+    def __init__(
+        self,
+        records: list[AgentRecord],
+        intervals: array,
+        next_fire: array,
+    ) -> None:
+        if not len(records) == len(intervals) == len(next_fire):
+            raise ValueError("records, intervals and next_fire must align")
+        self.records = records
+        self.intervals = intervals
+        self.next_fire = next_fire
+        self._index = {record.id: i for i, record in enumerate(records)}
+        if len(self._index) != len(records):
+            raise ValueError("duplicate agent id in registry")
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __getitem__(self, index: int) -> AgentRecord:
+        return self.records[index]
+
+    def index_of(self, agent_id: str) -> int:
+        return self._index[agent_id]
+
+    def due(self, now: float) -> list[int]:
+        """Return indices of agents whose next fire time is at or before `now`."""
+        return [i for i, fire_at in enumerate(self.next_fire) if fire_at <= now]
+
+    def mark_fired(self, index: int, now: float) -> None:
+        self.next_fire[index] = now + self.intervals[index]
+
+
+def compile_agents(configs: Iterable[AgentConfig], now: float) -> AgentRegistry:
+    """Compile validated configs into an `AgentRegistry`.
+
+    IDs and skill names are interned and identical steps and profiling
+    settings share one record, so fleets built from a few templates stay
+    small. Scheduled agents are first due one interval after `now`.
+    """
+    step_cache: dict[tuple[str, str], StepRecord] = {}
+    profiling_cache: dict[tuple[bool, float, float], ProfilingRecord] = {}
+    records: list[AgentRecord] = []
+    intervals = array("d")
+    next_fire = array("d")
+
+    for config in configs:
+        steps: list[StepRecord] = []
+        for step in config.steps:
+            key = (step.id, step.skill)
+            record = step_cache.get(key)
+            if record is None:
+                record = StepRecord(sys.intern(step.id), sys.intern(step.skill))
+                step_cache[key] = record
+            steps.append(record)
+
+        profiling_key = (
+            config.profiling.enabled,
+            config.profiling.slow_run_seconds,
+            config.profiling.sample_interval_ms,
+        )
+        profiling = profiling_cache.get(profiling_key)
+        if profiling is None:
+            profiling = ProfilingRecord(*profiling_key)
+            profiling_cache[profiling_key] = profiling
+
+        records.append(
+            AgentRecord(
+                id=sys.intern(config.id),
+                name=config.name,
+                timezone=sys.intern(config.timezone),
+                trigger_type=sys.intern(config.trigger.type),
+                steps=tuple(steps),
+                profiling=profiling,
+                includes=tuple(sys.intern(include) for include in config.includes),
+            )
+        )
+        interval = config.trigger.every_minutes * 60.0
+        intervals.append(interval)
+        if config.trigger.type == "schedule":
+            next_fire.append(now + interval)
+        else:
+            next_fire.append(math.inf)
+
+    return AgentRegistry(records, intervals, next_fire)
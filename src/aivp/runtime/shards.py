@@ -0,0 +1,316 @@
+"""Sharded daemon mode: consistent hashing, SQLite leases, and a supervisor."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import signal
+import subprocess
+import threading
+import time
+from bisect import bisect
+from collections.abc import Callable, Iterable
+from pathlib import Path
+
+from aivp.runtime.daemon import DaemonActionResult, PidFileLock, PidLockError
+from aivp.runtime.db import connect, get_migration_version
+from aivp.runtime.metrics import DB_TRANSACTION_SECONDS, REGISTRY
+
+SHARD_TABLES_DDL = (
+    """
+    CREATE TABLE IF NOT EXISTS shard_heartbeats (
+        shard_id TEXT PRIMARY KEY,
+        pid INTEGER NOT NULL,
+        expires_at REAL NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS agent_leases (
+        agent_id TEXT PRIMARY KEY,
+        shard_id TEXT NOT NULL,
+        expires_at REAL NOT NULL
+    )
+    """,
+)
+
+SHARD_OWNED_AGENTS = REGISTRY.gauge(
+    "aivp_shard_owned_agents",
+    "Agents currently leased by this shard.",
+)
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest())
+
+
+class HashRing:
+    """Consistent-hash ring with `replicas` virtual nodes per shard."""
+
+    def __init__(self, shard_ids: Iterable[str], replicas: int = 64) -> None:
+        points = sorted(
+            (_hash(f"{shard_id}#{replica}"), shard_id)
+            for shard_id in set(shard_ids)
+            for replica in range(replicas)
+        )
+        if not points:
+            raise ValueError("hash ring requires at least one shard")
+        self._hashes = [point for point, _ in points]
+        self._owners = [shard_id for _, shard_id in points]
+
+    def owner(self, key: str) -> str:
+        index = bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._owners[index]
+
+
+class LeaseStoreError(RuntimeError):
+    """Raised when the runtime DB cannot hold shard leases."""
+
+
+class LeaseStore:
+    """Shard heartbeats and per-agent ownership leases in the runtime DB.
+
+    Times are wall-clock seconds so leases are comparable across processes.
+    The DB must already be initialized with `db init`, so that shards share
+    it in WAL mode.
+    """
+
+    def __init__(self, db_path: Path, lease_seconds: float = 90.0) -> None:
+        if get_migration_version(db_path) is None:
+            raise LeaseStoreError(
+                f"runtime DB {db_path} is not initialized; run `db init`"
+            )
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        with connect(db_path) as conn:
+            for ddl in SHARD_TABLES_DDL:
+                conn.execute(ddl)
+            conn.commit()
+
+    def heartbeat(self, shard_id: str, now: float) -> None:
+        with connect(self.db_path) as conn, DB_TRANSACTION_SECONDS.time():
+            conn.execute(
+                """
+                INSERT INTO shard_heartbeats (shard_id, pid, expires_at)
+                VALUES (?, ?, ?)
+                ON CONFLICT(shard_id) DO UPDATE SET
+                    pid = excluded.pid,
+                    expires_at = excluded.expires_at
+                """,
+                (shard_id, os.getpid(), now + self.lease_seconds),
+            )
+            conn.commit()
+
+    def live_shards(self, now: float) -> list[str]:
+        with connect(self.db_path) as conn:
+            rows = conn.execute(
+                "SELECT shard_id FROM shard_heartbeats WHERE expires_at > ?",
+                (now,),
+            ).fetchall()
+        return sorted(row[0] for row in rows)
+
+    def claim(self, shard_id: str, agent_ids: Iterable[str], now: float) -> set[str]:
+        """Take or renew leases on `agent_ids`; return the agents now held.
+
+        A lease held by another shard is only taken over once it expired.
+        """
+        expires_at = now + self.lease_seconds
+        with connect(self.db_path) as conn, DB_TRANSACTION_SECONDS.time():
+            conn.executemany(
+                """
+                INSERT INTO agent_leases (agent_id, shard_id, expires_at)
+                VALUES (?, ?, ?)
+                ON CONFLICT(agent_id) DO UPDATE SET
+                    shard_id = excluded.shard_id,
+                    expires_at = excluded.expires_at
+                WHERE agent_leases.shard_id = excluded.shard_id
+                   OR agent_leases.expires_at <= ?
+                """,
+                [(agent_id, shard_id, expires_at, now) for agent_id in agent_ids],
+            )
+            rows = conn.execute(
+                """
+                SELECT agent_id FROM agent_leases
+                WHERE shard_id = ? AND expires_at > ?
+                """,
+                (shard_id, now),
+            ).fetchall()
+            conn.commit()
+        return {row[0] for row in rows}
+
+    def release(self, shard_id: str, agent_ids: Iterable[str] | None = None) -> None:
+        """Drop `agent_ids` (or every lease and the heartbeat) of `shard_id`."""
+        with connect(self.db_path) as conn, DB_TRANSACTION_SECONDS.time():
+            if agent_ids is None:
+                conn.execute("DELETE FROM agent_leases WHERE shard_id = ?", (shard_id,))
+                conn.execute(
+                    "DELETE FROM shard_heartbeats WHERE shard_id = ?", (shard_id,)
+                )
+            else:
+                conn.executemany(
+                    "DELETE FROM agent_leases WHERE shard_id = ? AND agent_id = ?",
+                    [(shard_id, agent_id) for agent_id in agent_ids],
+                )
+            conn.commit()
+
+
+class ShardMember:
+    """One shard's view of agent ownership, refreshed on every tick.
+
+    Each tick renews the shard heartbeat, places the live shards on a hash
+    ring, releases leases the ring assigns elsewhere, and claims the rest.
+    A crashed shard stops renewing, so once its heartbeat and leases expire
+    (one lease period) the surviving shards claim its agents. Ticks must run
+    more often than `LeaseStore.lease_seconds`.
+    """
+
+    def __init__(
+        self,
+        store: LeaseStore,
+        shard_id: str,
+        agent_ids: Iterable[str],
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.store = store
+        self.shard_id = shard_id
+        self.agent_ids = list(agent_ids)
+        self.clock = clock
+        self.owned: set[str] = set()
+
+    def tick(self) -> set[str]:
+        now = self.clock()
+        self.store.heartbeat(self.shard_id, now)
+        ring = HashRing([*self.store.live_shards(now), self.shard_id])
+        assigned = [a for a in self.agent_ids if ring.owner(a) == self.shard_id]
+        handed_off = self.owned.difference(assigned)
+        if handed_off:
+            self.store.release(self.shard_id, handed_off)
+        self.owned = self.store.claim(self.shard_id, assigned, now)
+        SHARD_OWNED_AGENTS.set(len(self.owned))
+        return self.owned
+
+    def leave(self) -> None:
+        self.store.release(self.shard_id)
+        self.owned = set()
+        SHARD_OWNED_AGENTS.set(0)
+
+
+def shard_path(path: Path, shard_id: str) -> Path:
+    """Return the per-shard sibling of `path`, e.g. `daemon-shard-0.pid`."""
+    stem, dot, suffixes = path.name.partition(".")
+    return path.with_name(f"{stem}-{shard_id}{dot}{suffixes}")
+
+
+class ShardSupervisor:
+    """Run one daemon process per shard and restart shards that exit.
+
+    The supervisor holds `pid_file` itself, so `aivp daemon stop` on that
+    file stops the supervisor, which then terminates its shards. A shard
+    that exits is restarted after `restart_backoff_seconds`, doubling for
+    each consecutive exit up to `max_backoff_seconds`; the delay resets once
+    a shard has stayed up for `max_backoff_seconds`.
+    """
+
+    def __init__(
+        self,
+        pid_file: Path,
+        shard_ids: list[str],
+        command_for: Callable[[str], list[str]],
+        poll_seconds: float = 1.0,
+        stop_timeout_seconds: float = 10.0,
+        restart_backoff_seconds: float = 1.0,
+        max_backoff_seconds: float = 60.0,
+    ) -> None:
+        self.pid_file = pid_file
+        self.shard_ids = shard_ids
+        self.command_for = command_for
+        self.poll_seconds = poll_seconds
+        self.stop_timeout_seconds = stop_timeout_seconds
+        self.restart_backoff_seconds = restart_backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.restarts = 0
+
+    def _backoff(self, exits: int) -> float:
+        return min(
+            self.restart_backoff_seconds * 2 ** max(exits - 1, 0),
+            self.max_backoff_seconds,
+        )
+
+    def _spawn(self, shard_id: str) -> subprocess.Popen[bytes]:
+        return subprocess.Popen(self.command_for(shard_id))
+
+    def _terminate(self, children: dict[str, subprocess.Popen[bytes]]) -> None:
+        for child in children.values():
+            if child.poll() is None:
+                child.terminate()
+        deadline = time.monotonic() + self.stop_timeout_seconds
+        for child in children.values():
+            try:
+                child.wait(timeout=max(deadline - time.monotonic(), 0.0))
+            except subprocess.TimeoutExpired:
+                child.kill()
+                child.wait()
+
+    def run(self, max_polls: int | None = None) -> DaemonActionResult:
+        lock = PidFileLock(self.pid_file)
+        try:
+            lock.acquire()
+        except PidLockError:
+            return DaemonActionResult(
+                status="already_running",
+                message="supervisor start blocked by active pid lock",
+            )
+
+        stopping = threading.Event()
+
+        def _handle_signal(_signum: int, _frame: object) -> None:
+            stopping.set()
+
+        old_sigint = signal.signal(signal.SIGINT, _handle_signal)
+        old_sigterm = None
+        if hasattr(signal, "SIGTERM"):
+            old_sigterm = signal.signal(signal.SIGTERM, _handle_signal)
+
+        children: dict[str, subprocess.Popen[bytes]] = {}
+        spawned_at: dict[str, float] = {}
+        exits = dict.fromkeys(self.shard_ids, 0)
+        restart_at: dict[str, float] = {}
+        try:
+            for shard_id in self.shard_ids:
+                children[shard_id] = self._spawn(shard_id)
+                spawned_at[shard_id] = time.monotonic()
+            polls = 0
+            while not stopping.is_set():
+                if max_polls is not None and polls >= max_polls:
+                    break
+                if stopping.wait(max(self.poll_seconds, 0.01)):
+                    break
+                polls += 1
+                now = time.monotonic()
+                for shard_id, child in list(children.items()):
+                    if child.poll() is None:
+                        continue
+                    if shard_id not in restart_at:
+                        uptime = now - spawned_at[shard_id]
+                        if uptime >= self.max_backoff_seconds:
+                            exits[shard_id] = 0
+                        exits[shard_id] += 1
+                        restart_at[shard_id] = now + self._backoff(exits[shard_id])
+                    if now >= restart_at[shard_id]:
+                        del restart_at[shard_id]
+                        children[shard_id] = self._spawn(shard_id)
+                        spawned_at[shard_id] = now
+                        self.restarts += 1
+        finally:
+            self._terminate(children)
+            if old_sigterm is not None:
+                signal.signal(signal.SIGTERM, old_sigterm)
+            signal.signal(signal.SIGINT, old_sigint)
+            lock.release()
+
+        return DaemonActionResult(
+            status="started",
+            message=(
+                f"supervised {len(self.shard_ids)} shards with {self.restarts} restarts"
+            ),
+            pid=os.getpid(),
+        )
@@ -0,0 +1,209 @@
+"""Per-agent key-value state store with a write-back run cache."""
+
+from __future__ import annotations
+
+import json
+import zlib
+from collections.abc import Iterable
+from pathlib import Path
+
+from aivp.runtime.db import connect
+from aivp.runtime.metrics import DB_TRANSACTION_SECONDS
+
+AGENT_STATE_TABLE_DDL = """
+CREATE TABLE IF NOT EXISTS agent_state (
+    agent_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    compressed INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (agent_id, key)
+) WITHOUT ROWID
+"""
+
+# keeps `IN (...)` lists under SQLite's bound-parameter limit
+_KEY_BATCH = 500
+
+
+class AgentStateStore:
+    """SQLite-backed JSON values scoped by agent id.
+
+    Encoded values of at least `compress_threshold` bytes are stored
+    zlib-compressed when that makes them smaller.
+    """
+
+    def __init__(self, db_path: Path, compress_threshold: int = 1024) -> None:
+        self.db_path = db_path
+        self.compress_threshold = compress_threshold
+        with connect(db_path) as conn:
+            conn.execute(AGENT_STATE_TABLE_DDL)
+            conn.commit()
+
+    def _encode(self, value: object) -> tuple[bytes, int]:
+        raw = json.dumps(value, separators=(",", ":")).encode("utf-8")
+        if len(raw) >= self.compress_threshold:
+            packed = zlib.compress(raw)
+            if len(packed) < len(raw):
+                return packed, 1
+        return raw, 0
+
+    @staticmethod
+    def _decode(value: bytes, compressed: int) -> object:
+        if compressed:
+            value = zlib.decompress(value)
+        return json.loads(value)
+
+    def load(
+        self, agent_id: str, keys: Iterable[str] | None = None
+    ) -> dict[str, object]:
+        """Return stored values for `keys` (or every key) of `agent_id`."""
+        with connect(self.db_path) as conn:
+            if keys is None:
+                rows = conn.execute(
+                    "SELECT key, value, compressed FROM agent_state WHERE agent_id = ?",
+                    (agent_id,),
+                ).fetchall()
+            else:
+                wanted = list(dict.fromkeys(keys))
+                rows = []
+                for start in range(0, len(wanted), _KEY_BATCH):
+                    batch = wanted[start : start + _KEY_BATCH]
+                    placeholders = ",".join("?" * len(batch))
+                    rows.extend(
+                        conn.execute(
+                            "SELECT key, value, compressed FROM agent_state "
+                            f"WHERE agent_id = ? AND key IN ({placeholders})",
+                            (agent_id, *batch),
+                        ).fetchall()
+                    )
+        return {key: self._decode(value, compressed) for key, value, compressed in rows}
+
+    def write(
+        self,
+        agent_id: str,
+        updates: dict[str, object],
+        deletes: Iterable[str] = (),
+    ) -> None:
+        """Apply `updates` and `deletes` for `agent_id` in one transaction."""
+        rows = [(agent_id, key, *self._encode(value)) for key, value in updates.items()]
+        removed = [(agent_id, key) for key in deletes]
+        if not rows and not removed:
+            return
+        with connect(self.db_path) as conn, DB_TRANSACTION_SECONDS.time():
+            conn.executemany(
+                """
+                INSERT INTO agent_state (agent_id, key, value, compressed)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(agent_id, key) DO UPDATE SET
+                    value = excluded.value,
+                    compressed = excluded.compressed,
+                    updated_at = CURRENT_TIMESTAMP
+                """,
+                rows,
+            )
+            conn.executemany(
+                "DELETE FROM agent_state WHERE agent_id = ? AND key = ?",
+                removed,
+            )
+            conn.commit()
+
+    def cache(self, agent_id: str) -> StateCache:
+        return StateCache(self, agent_id)
+
+
+class StateCache:
+    """Write-back view of one agent's state for the duration of a run.
+
+    Reads are served from memory after the first load; `set` and `delete`
+    only mark keys dirty until `flush`, which writes them in one
+    transaction. Values returned by `get` must not be mutated in place;
+    call `set` with the new value instead. Used as a context manager, the
+    cache flushes on a clean exit and discards changes on an exception.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, store: AgentStateStore, agent_id: str) -> None:
+        self.store = store
+        self.agent_id = agent_id
+        self._values: dict[str, object] = {}
+        self._absent: set[str] = set()
+        self._dirty: set[str] = set()
+        self._deleted: set[str] = set()
+        self._loaded_all = False
+
+    def _known(self, key: str) -> bool:
+        return self._loaded_all or key in self._values or key in self._absent
+
+    def prefetch(self, keys: Iterable[str] | None = None) -> None:
+        """Load `keys` (or the whole working set) in a single query."""
+        if keys is None:
+            if self._loaded_all:
+                return
+            loaded = self.store.load(self.agent_id)
+            self._loaded_all = True
+            self._absent.clear()
+            wanted: list[str] = list(loaded)
+        else:
+            wanted = [key for key in dict.fromkeys(keys) if not self._known(key)]
+            if not wanted:
+                return
+            loaded = self.store.load(self.agent_id, wanted)
+            self._absent.update(key for key in wanted if key not in loaded)
+        for key in wanted:
+            # never clobber local changes with stored values
+            if key in loaded and key not in self._dirty and key not in self._deleted:
+                self._values[key] = loaded[key]
+
+    def get(self, key: str, default: object = None) -> object:
+        if not self._known(key):
+            self.prefetch([key])
+        value = self._values.get(key, self._MISSING)
+        return default if value is self._MISSING else value
+
+    def set(self, key: str, value: object) -> None:
+        self._values[key] = value
+        self._absent.discard(key)
+        self._deleted.discard(key)
+        self._dirty.add(key)
+
+    def delete(self, key: str) -> None:
+        self._values.pop(key, None)
+        self._absent.add(key)
+        self._dirty.discard(key)
+        self._deleted.add(key)
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self._dirty or self._deleted)
+
+    def flush(self) -> int:
+        """Write pending changes in one transaction; return the change count."""
+        changes = len(self._dirty) + len(self._deleted)
+        if not changes:
+            return 0
+        self.store.write(
+            self.agent_id,
+            {key: self._values[key] for key in self._dirty},
+            self._deleted,
+        )
+        self._dirty.clear()
+        self._deleted.clear()
+        return changes
+
+    def discard(self) -> None:
+        """Drop pending changes and cached values."""
+        self._values.clear()
+        self._absent.clear()
+        self._dirty.clear()
+        self._deleted.clear()
+        self._loaded_all = False
+
+    def __enter__(self) -> StateCache:
+        return self
+
+    def __exit__(self, exc_type: object, *_exc: object) -> None:
+        if exc_type is None:
+            self.flush()
+        else:
+            self.discard()
@@ -0,0 +1,113 @@
+"""Run worker that times, traces, and optionally profiles agent runs."""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+from pathlib import Path
+
+from aivp.config.models import AgentConfig
+from aivp.runtime.db import RunTrace, record_run_trace
+from aivp.runtime.metrics import RUN_DURATION_SECONDS
+from aivp.runtime.profiler import SamplingProfiler
+from aivp.runtime.registry import AgentRecord
+from aivp.runtime.state import AgentStateStore
+
+
+def profile_artifact_path(artifacts_dir: Path, agent_id: str, run_id: str) -> Path:
+    """Return the profile artifact path, refusing ids that escape `profiles/`."""
+    profiles_dir = (artifacts_dir / "profiles").resolve()
+    path = (profiles_dir / agent_id / f"{run_id}.collapsed").resolve()
+    if not path.is_relative_to(profiles_dir) or path.parent == profiles_dir:
+        raise ValueError(
+            f"agent id {agent_id!r} and run id {run_id!r} do not form a path "
+            f"inside {profiles_dir}"
+        )
+    return path
+
+
+def execute_run(
+    agent: AgentConfig | AgentRecord,
+    run_id: str,
+    body: Callable[..., object],
+    artifacts_dir: Path,
+    db_path: Path,
+    state_store: AgentStateStore | None = None,
+) -> RunTrace:
+    """Execute `body` as one run of `agent` and record its trace row.
+
+    `agent` is usually a compiled `AgentRecord`; validated `AgentConfig`
+    models are accepted as well.
+
+    With a `state_store`, `body` is called with the agent's `StateCache`,
+    which is prefetched before the body runs, flushed in one transaction when
+    it returns, and discarded if it raises; otherwise `body` takes no
+    arguments.
+
+    When `agent.profiling.enabled` is set, the run is sampled on its own
+    thread and the collapsed stacks are saved as an artifact if the run takes
+    at least `slow_run_seconds`; the artifact path is stored on the trace
+    row. Exceptions from `body` are recorded as a failed run and re-raised;
+    if recording then fails too, that failure is attached to the original
+    exception as a note instead of replacing it.
+    """
+    profiling = agent.profiling
+    profiler: SamplingProfiler | None = None
+    artifact_path: Path | None = None
+    if profiling.enabled:
+        artifact_path = profile_artifact_path(artifacts_dir, agent.id, run_id)
+        profiler = SamplingProfiler(
+            interval_seconds=profiling.sample_interval_ms / 1000.0
+        )
+        profiler.start()
+
+    started_at = datetime.now(timezone.utc).isoformat()
+    started = time.perf_counter()
+    status = "failed"
+    error: BaseException | None = None
+    cache = None if state_store is None else state_store.cache(agent.id)
+    try:
+        if cache is None:
+            body()
+        else:
+            cache.prefetch()
+            body(cache)
+            cache.flush()
+        status = "succeeded"
+    except BaseException as exc:
+        error = exc
+        if cache is not None:
+            cache.discard()
+        raise
+    finally:
+        duration = time.perf_counter() - started
+        if profiler is not None:
+            profiler.stop()
+        RUN_DURATION_SECONDS.observe(duration)
+
+        try:
+            profile_artifact: str | None = None
+            if (
+                profiler is not None
+                and artifact_path is not None
+                and duration >= profiling.slow_run_seconds
+            ):
+                profiler.write_collapsed(artifact_path)
+                profile_artifact = str(artifact_path)
+
+            trace = RunTrace(
+                run_id=run_id,
+                agent_id=agent.id,
+                started_at=started_at,
+                duration_seconds=duration,
+                status=status,
+                profile_artifact=profile_artifact,
+            )
+            record_run_trace(db_path, trace)
+        except Exception as record_exc:
+            if error is None:
+                raise
+            error.add_note(f"recording run {run_id!r} failed: {record_exc!r}")
+
+    return trace
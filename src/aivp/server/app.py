@@ -5,6 +5,11 @@ from __future__ import annotations
 from dataclasses import asdict, dataclass
 from pathlib import Path
 
+from aivp.runtime.metrics import parse_text_samples
+from aivp.runtime.shards import shard_path
+
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
 
 @dataclass(frozen=True)
 class ServerConfig:
@@ -12,10 +17,45 @@ class ServerConfig:
     db_path: Path
     artifacts_dir: Path
     backups_dir: Path
+    metrics_file: Path | None = None
 
 
-def build_server_summary(config: ServerConfig) -> dict[str, object]:
-    """Return a minimal health summary for local scaffolding checks."""
+def _shard_metrics_files(metrics_file: Path) -> dict[str, Path]:
+    """Return the `shard_path` siblings of `metrics_file` by shard id."""
+    head, _, tail = shard_path(metrics_file, "{shard_id}").name.partition("{shard_id}")
+    return {
+        path.name[len(head) : len(path.name) - len(tail)]: path
+        for path in sorted(metrics_file.parent.glob(f"{head}shard-*{tail}"))
+    }
+
+
+def _read_published_metrics(metrics_file: Path | None) -> dict[str, object]:
+    if metrics_file is None:
+        return {"available": False, "samples": {}, "shards": {}}
+    samples: dict[str, float] = {}
+    if metrics_file.exists():
+        samples = parse_text_samples(metrics_file.read_text(encoding="utf-8"))
+    shards = {
+        shard_id: parse_text_samples(path.read_text(encoding="utf-8"))
+        for shard_id, path in _shard_metrics_files(metrics_file).items()
+    }
+    return {
+        "available": metrics_file.exists() or bool(shards),
+        "samples": samples,
+        "shards": shards,
+    }
+
+
+def build_server_summary(
+    config: ServerConfig,
+    include_metrics: bool = False,
+) -> dict[str, object]:
+    """Return a minimal health summary for local scaffolding checks.
+
+    With `include_metrics`, samples last published by the daemon to
+    `config.metrics_file` are added under the `metrics` key, and samples
+    from sharded daemons' per-shard files under `metrics.shards`.
+    """
     summary = {
         key: str(value) if isinstance(value, Path) else value
         for key, value in asdict(config).items()
@@ -26,4 +66,17 @@ def build_server_summary(config: ServerConfig) -> dict[str, object]:
         "artifacts_dir": config.artifacts_dir.exists(),
         "backups_dir": config.backups_dir.exists(),
     }
+    if include_metrics:
+        summary["metrics"] = _read_published_metrics(config.metrics_file)
     return summary
+
+
+def build_metrics_response(config: ServerConfig) -> tuple[str, str]:
+    """Return `(content_type, body)` for the text-format metrics endpoint.
+
+    The body is the exposition last published by the daemon to
+    `config.metrics_file`, or empty when nothing was published yet.
+    """
+    if config.metrics_file is None or not config.metrics_file.exists():
+        return METRICS_CONTENT_TYPE, ""
+    return METRICS_CONTENT_TYPE, config.metrics_file.read_text(encoding="utf-8")
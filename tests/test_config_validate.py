@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from aivp.config.validate import load_config_dir, validate_config_dir
+
+AGENT_TEMPLATE = """\
+schema_version: v1alpha1
+id: {agent_id}
+name: VP {agent_id}
+trigger:
+  type: schedule
+  every_minutes: 10
+steps:
+  - id: fetch_input
+    skill: {skill}
+{extra}"""
+
+
+def _write_agent(
+    root: Path,
+    name: str,
+    agent_id: str,
+    skill: str = "gmail.fetch",
+    extra: str = "",
+) -> Path:
+    path = root / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        AGENT_TEMPLATE.format(agent_id=agent_id, skill=skill, extra=extra),
+        encoding="utf-8",
+    )
+    return path
+
+
+class ValidateConfigDirTests(unittest.TestCase):
+    def test_valid_directory_has_no_errors(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            _write_agent(root, "a.yaml", "vp-a")
+            _write_agent(root, "nested/b.yml", "vp-b")
+
+            report = validate_config_dir(root, known_skills=["gmail.fetch"])
+
+            self.assertTrue(report.ok)
+            self.assertEqual((report.files, report.valid), (2, 2))
+
+    def test_reports_all_schema_and_yaml_errors_at_once(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            _write_agent(root, "good.yaml", "vp-good")
+            (root / "missing_trigger.yaml").write_text(
+                "id: vp-x\nname: X\n", encoding="utf-8"
+            )
+            (root / "broken.yaml").write_text("id: [unclosed\n", encoding="utf-8")
+
+            report = validate_config_dir(root)
+
+            errors = {(Path(e.file).name, e.type, tuple(e.loc)) for e in report.errors}
+            self.assertIn(("missing_trigger.yaml", "missing", ("trigger",)), errors)
+            self.assertIn(("broken.yaml", "yaml_error", ()), errors)
+            self.assertEqual(report.valid, 1)
+
+    def test_duplicate_ids_and_unknown_skills(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            _write_agent(root, "a.yaml", "vp-same")
+            _write_agent(root, "b.yaml", "vp-same", skill="sheets.append")
+
+            report = validate_config_dir(root, known_skills=["gmail.fetch"])
+
+            types = sorted((Path(e.file).name, e.type) for e in report.errors)
+            self.assertEqual(
+                types,
+                [
+                    ("a.yaml", "duplicate_id"),
+                    ("b.yaml", "duplicate_id"),
+                    ("b.yaml", "unknown_skill"),
+                ],
+            )
+
+    def test_include_cycles_and_missing_includes(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            _write_agent(root, "a.yaml", "vp-a", extra="includes: [b.yaml]\n")
+            _write_agent(root, "b.yaml", "vp-b", extra="includes: [a.yaml]\n")
+            _write_agent(root, "c.yaml", "vp-c", extra="includes: [nope.yaml]\n")
+
+            report = validate_config_dir(root)
+
+            types = [e.type for e in report.errors]
+            self.assertEqual(types.count("include_not_found"), 1)
+            cycles = [e for e in report.errors if e.type == "include_cycle"]
+            self.assertEqual(
+                sorted(Path(e.file).name for e in cycles), ["a.yaml", "b.yaml"]
+            )
+            for error in cycles:
+                self.assertIn("a.yaml", error.msg)
+                self.assertIn("b.yaml", error.msg)
+
+    def test_include_cycle_through_invalid_file(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            _write_agent(root, "a.yaml", "vp-a", extra="includes: [b.yaml]\n")
+            (root / "b.yaml").write_text(
+                "id: vp-b\nincludes: [a.yaml]\n", encoding="utf-8"
+            )
+
+            agents, report = load_config_dir(root)
+
+            cycles = [e for e in report.errors if e.type == "include_cycle"]
+            self.assertEqual(
+                sorted(Path(e.file).name for e in cycles), ["a.yaml", "b.yaml"]
+            )
+            self.assertEqual(agents, [])
+
+    def test_process_pool_matches_serial_results(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            for i in range(12):
+                _write_agent(root, f"agent-{i:02d}.yaml", f"vp-{i}")
+            (root / "bad.yaml").write_text("id: vp-bad\n", encoding="utf-8")
+
+            serial = validate_config_dir(root, workers=1, batch_size=4)
+            pooled = validate_config_dir(root, workers=2, batch_size=4)
+
+            self.assertEqual(serial, pooled)
+            self.assertEqual(serial.valid, 12)
+
+
+if __name__ == "__main__":
+    unittest.main()
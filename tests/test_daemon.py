@@ -13,6 +13,7 @@ from aivp.runtime.daemon import (
     PidFileLock,
     PidLockError,
 )
+from aivp.runtime.metrics import parse_text_samples
 
 
 class PidFileLockTests(unittest.TestCase):
@@ -106,6 +107,31 @@ class DaemonRunnerTests(unittest.TestCase):
             self.assertEqual(first.status, "started")
             self.assertEqual(second.status, "started")
 
+    def test_start_publishes_metrics_file(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            metrics_file = Path(tmpdir) / "daemon.metrics.prom"
+            runner = DaemonRunner(
+                Path(tmpdir) / "daemon.pid", metrics_file=metrics_file
+            )
+
+            result = runner.start(max_heartbeats=1, heartbeat_seconds=0.01)
+
+            self.assertEqual(result.status, "started")
+            samples = parse_text_samples(metrics_file.read_text(encoding="utf-8"))
+            self.assertGreaterEqual(samples["aivp_daemon_heartbeats_total"], 1)
+            self.assertGreaterEqual(samples["aivp_daemon_loop_lag_seconds_count"], 1)
+
+    def test_start_invokes_heartbeat_hook_each_cycle(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            calls: list[int] = []
+            runner = DaemonRunner(
+                Path(tmpdir) / "daemon.pid", on_heartbeat=lambda: calls.append(1)
+            )
+
+            runner.start(max_heartbeats=2, heartbeat_seconds=0.01)
+
+            self.assertEqual(len(calls), 3)
+
     def test_restart_passes_parameters_to_start(self) -> None:
         with tempfile.TemporaryDirectory() as tmpdir:
             runner = DaemonRunner(Path(tmpdir) / "daemon.pid")
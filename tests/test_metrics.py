@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import tempfile
+import timeit
+import unittest
+from pathlib import Path
+
+from aivp.runtime.metrics import (
+    Histogram,
+    MetricsRegistry,
+    parse_text_samples,
+    write_textfile,
+)
+
+
+class HistogramTests(unittest.TestCase):
+    def test_observations_land_in_inclusive_buckets(self) -> None:
+        histogram = Histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+
+        histogram.observe(0.05)
+        histogram.observe(0.1)
+        histogram.observe(0.5)
+        histogram.observe(5.0)
+
+        self.assertEqual(histogram.counts, [2, 1, 1])
+        self.assertEqual(histogram.count, 4)
+        self.assertAlmostEqual(histogram.sum, 5.65)
+
+    def test_samples_are_cumulative(self) -> None:
+        histogram = Histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value)
+
+        samples = dict(histogram.samples())
+
+        self.assertEqual(samples['latency_seconds_bucket{le="0.1"}'], 1)
+        self.assertEqual(samples['latency_seconds_bucket{le="1"}'], 2)
+        self.assertEqual(samples['latency_seconds_bucket{le="+Inf"}'], 3)
+        self.assertEqual(samples["latency_seconds_count"], 3)
+
+    def test_observe_stays_under_one_microsecond(self) -> None:
+        histogram = Histogram("latency_seconds", "Latency.")
+        iterations = 100_000
+
+        elapsed = min(
+            timeit.repeat(lambda: histogram.observe(0.003), number=iterations, repeat=3)
+        )
+
+        # generous ceiling so slow CI hosts do not flake
+        self.assertLess(elapsed / iterations, 2e-6)
+
+
+class MetricsRegistryTests(unittest.TestCase):
+    def test_register_returns_existing_metric(self) -> None:
+        registry = MetricsRegistry()
+
+        first = registry.counter("events_total", "Events.")
+        second = registry.counter("events_total", "Events.")
+
+        self.assertIs(first, second)
+
+    def test_register_rejects_kind_mismatch(self) -> None:
+        registry = MetricsRegistry()
+        registry.counter("events_total", "Events.")
+
+        with self.assertRaises(ValueError):
+            registry.gauge("events_total", "Events.")
+
+    def test_render_text_round_trips_through_parser(self) -> None:
+        registry = MetricsRegistry()
+        registry.counter("events_total", "Events.").inc(3)
+        registry.gauge("queue_depth", "Depth.").set(7)
+        registry.histogram("latency_seconds", "Latency.", buckets=(1.0,)).observe(0.5)
+
+        text = registry.render_text()
+
+        self.assertIn("# TYPE events_total counter", text)
+        self.assertIn("# TYPE latency_seconds histogram", text)
+        self.assertEqual(parse_text_samples(text), registry.snapshot())
+
+    def test_render_text_handles_nan_and_huge_values(self) -> None:
+        registry = MetricsRegistry()
+        registry.gauge("nan_value", "NaN.").set(float("nan"))
+        registry.gauge("huge_value", "Huge.").set(1e300)
+
+        text = registry.render_text()
+
+        self.assertIn("nan_value NaN\n", text)
+        self.assertIn("huge_value 1e+300\n", text)
+
+    def test_write_textfile_replaces_previous_contents(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "runtime" / "daemon.metrics.prom"
+            registry = MetricsRegistry()
+            counter = registry.counter("events_total", "Events.")
+
+            write_textfile(registry, path)
+            counter.inc()
+            write_textfile(registry, path)
+
+            samples = parse_text_samples(path.read_text(encoding="utf-8"))
+            self.assertEqual(samples, {"events_total": 1.0})
+            self.assertEqual([p.name for p in path.parent.iterdir()], [path.name])
+
+
+if __name__ == "__main__":
+    unittest.main()
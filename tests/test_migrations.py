@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+from aivp.runtime.db import bootstrap_sqlite, get_migration_version
+from aivp.runtime.migrations import (
+    RUNTIME_MIGRATIONS,
+    Backfill,
+    MigrationError,
+    MigrationRunner,
+    MigrationStep,
+)
+
+ADD_SCORE = MigrationStep(
+    version="v1alpha2",
+    description="add and backfill items.score",
+    statements=("ALTER TABLE items ADD COLUMN score INTEGER",),
+    backfill=Backfill(
+        table="items",
+        update_sql="UPDATE items SET score = value * 2 WHERE rowid > ? AND rowid <= ?",
+    ),
+)
+ADD_INDEX = MigrationStep(
+    version="v1alpha3",
+    description="index items.score",
+    statements=("CREATE INDEX items_score_idx ON items (score)",),
+    scan_tables=("items",),
+)
+
+
+def _seed(db_path: Path, rows: int) -> None:
+    bootstrap_sqlite(db_path)
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, value INTEGER)")
+        conn.executemany(
+            "INSERT INTO items (value) VALUES (?)", [(i,) for i in range(rows)]
+        )
+        conn.commit()
+
+
+def _schema_state(db_path: Path) -> tuple[str, str | None, int | None]:
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(
+            """
+            SELECT migration_version, migration_step, migration_cursor
+            FROM schema_state WHERE id = 1
+            """
+        ).fetchone()
+
+
+class MigrationRunnerTests(unittest.TestCase):
+    def test_run_applies_steps_in_order(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / "aivp.sqlite3"
+            _seed(db_path, rows=25)
+
+            result = MigrationRunner(
+                db_path, steps=(ADD_SCORE, ADD_INDEX), chunk_size=10
+            ).run()
+
+            self.assertEqual(result.applied, ["v1alpha2", "v1alpha3"])
+            self.assertEqual(result.chunks, 3)
+            self.assertTrue(result.complete)
+            self.assertEqual(_schema_state(db_path), ("v1alpha3", None, None))
+            with sqlite3.connect(db_path) as conn:
+                mismatched = conn.execute(
+                    "SELECT COUNT(*) FROM items WHERE score IS NOT value * 2"
+                ).fetchone()[0]
+            self.assertEqual(mismatched, 0)
+
+    def test_backfill_resumes_from_checkpoint(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / "aivp.sqlite3"
+            _seed(db_path, rows=25)
+            runner = MigrationRunner(db_path, steps=(ADD_SCORE,), chunk_size=10)
+
+            partial = runner.run(max_chunks=1)
+
+            self.assertFalse(partial.complete)
+            self.assertEqual(_schema_state(db_path), ("v1alpha1", "v1alpha2", 10))
+
+            resumed = runner.run()
+
+            self.assertEqual(resumed.applied, ["v1alpha2"])
+            self.assertEqual(resumed.chunks, 2)
+            self.assertEqual(get_migration_version(db_path), "v1alpha2")
+
+    def test_plan_estimates_without_changing_db(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / "aivp.sqlite3"
+            _seed(db_path, rows=25)
+
+            estimates = MigrationRunner(
+                db_path, steps=(ADD_SCORE, ADD_INDEX), chunk_size=10
+            ).plan()
+
+            self.assertEqual([e.version for e in estimates], ["v1alpha2", "v1alpha3"])
+            self.assertEqual(estimates[1].scan_rows, 25)
+            self.assertEqual(estimates[0].backfill_rows, 25)
+            self.assertEqual(estimates[0].backfill_chunks, 3)
+            self.assertGreaterEqual(estimates[0].estimated_seconds, 0.0)
+            self.assertEqual(_schema_state(db_path), ("v1alpha1", None, None))
+            with sqlite3.connect(db_path) as conn:
+                columns = {row[1] for row in conn.execute("PRAGMA table_info(items)")}
+            self.assertNotIn("score", columns)
+
+    def test_plan_does_not_block_concurrent_writers(self) -> None:
+        test = self
+
+        class WritingRunner(MigrationRunner):
+            def _read_cost(self, conn, table, cursor):  # type: ignore[no-untyped-def]
+                # a writer that would fail at once if plan() held the write lock
+                with sqlite3.connect(self.db_path, timeout=0) as writer:
+                    writer.execute("INSERT INTO items (value) VALUES (-1)")
+                    writer.commit()
+                test.writes += 1
+                return super()._read_cost(conn, table, cursor)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / "aivp.sqlite3"
+            _seed(db_path, rows=25)
+            self.writes = 0
+
+            WritingRunner(db_path, steps=(ADD_SCORE, ADD_INDEX)).plan()
+
+            self.assertEqual(self.writes, 2)
+            with sqlite3.connect(db_path) as conn:
+                count = conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+            self.assertEqual(count, 27)
+
+    def test_run_refuses_uninitialized_db_without_changes(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / "aivp.sqlite3"
+            with sqlite3.connect(db_path) as conn:
+                conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY)")
+
+            with self.assertRaises(MigrationError):
+                MigrationRunner(db_path).run()
+
+            with sqlite3.connect(db_path) as conn:
+                tables = [
+                    row[0]
+                    for row in conn.execute(
+                        "SELECT name FROM sqlite_master WHERE type = 'table'"
+                    )
+                ]
+            self.assertEqual(tables, ["items"])
+
+    def test_up_to_date_db_has_nothing_pending(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / "aivp.sqlite3"
+            _seed(db_path, rows=1)
+            runner = MigrationRunner(db_path, steps=(ADD_SCORE,))
+            runner.run()
+
+            self.assertEqual(runner.plan(), [])
+            self.assertEqual(runner.run().applied, [])
+
+    def test_unknown_version_raises(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / "aivp.sqlite3"
+            bootstrap_sqlite(db_path, initial_migration_version="v9")
+
+            with self.assertRaises(MigrationError):
+                MigrationRunner(db_path, steps=(ADD_SCORE,)).run()
+
+    def test_builtin_migrations_apply_to_fresh_db(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / "aivp.sqlite3"
+            bootstrap_sqlite(db_path)
+
+            result = MigrationRunner(db_path).run()
+
+            self.assertEqual(result.to_version, RUNTIME_MIGRATIONS[-1].version)
+
+    def test_plan_leaves_legacy_schema_state_untouched(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / "aivp.sqlite3"
+            with sqlite3.connect(db_path) as conn:
+                conn.execute(
+                    """
+                    CREATE TABLE schema_state (
+                        id INTEGER PRIMARY KEY CHECK (id = 1),
+                        migration_version TEXT NOT NULL,
+                        updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+                    )
+                    """
+                )
+                conn.execute(
+                    "INSERT INTO schema_state (id, migration_version) "
+                    "VALUES (1, 'v1alpha1')"
+                )
+                conn.commit()
+
+            estimates = MigrationRunner(db_path).plan()
+
+            self.assertEqual(len(estimates), len(RUNTIME_MIGRATIONS))
+            with sqlite3.connect(db_path) as conn:
+                columns = [
+                    row[1] for row in conn.execute("PRAGMA table_info(schema_state)")
+                ]
+                tables = {
+                    row[0]
+                    for row in conn.execute(
+                        "SELECT name FROM sqlite_master WHERE type = 'table'"
+                    )
+                }
+            self.assertEqual(columns, ["id", "migration_version", "updated_at"])
+            self.assertEqual(tables, {"schema_state"})
+
+            MigrationRunner(db_path).run()
+
+            self.assertEqual(
+                _schema_state(db_path), (RUNTIME_MIGRATIONS[-1].version, None, None)
+            )
+
+    def test_missing_db_is_not_created(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / "db" / "aivp.sqlite3"
+            runner = MigrationRunner(db_path)
+
+            with self.assertRaises(MigrationError):
+                runner.plan()
+            with self.assertRaises(MigrationError):
+                runner.run()
+
+            self.assertFalse(db_path.parent.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from aivp.runtime.profiler import SamplingProfiler
+
+
+def _busy_leaf(deadline: float) -> None:
+    while time.perf_counter() < deadline:
+        pass
+
+
+def _busy_root(seconds: float) -> None:
+    _busy_leaf(time.perf_counter() + seconds)
+
+
+class SamplingProfilerTests(unittest.TestCase):
+    def test_samples_current_thread_stack_root_first(self) -> None:
+        with SamplingProfiler(interval_seconds=0.001) as profiler:
+            _busy_root(0.1)
+
+        self.assertGreater(profiler.sample_count, 0)
+        stack = next(stack for stack in profiler.stacks if stack.endswith("_busy_leaf"))
+        frames = stack.split(";")
+        self.assertLess(
+            frames.index(f"{__name__}:_busy_root"),
+            frames.index(f"{__name__}:_busy_leaf"),
+        )
+
+    def test_sample_ignores_unknown_thread(self) -> None:
+        profiler = SamplingProfiler(thread_id=-1)
+
+        profiler.sample()
+
+        self.assertEqual(profiler.sample_count, 0)
+
+    def test_start_twice_raises(self) -> None:
+        profiler = SamplingProfiler()
+        profiler.start()
+        try:
+            with self.assertRaises(RuntimeError):
+                profiler.start()
+        finally:
+            profiler.stop()
+
+    def test_write_collapsed_emits_stack_and_count(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "profiles" / "run.collapsed"
+            profiler = SamplingProfiler(thread_id=threading.get_ident())
+            profiler.sample()
+            profiler.sample()
+
+            profiler.write_collapsed(path)
+
+            lines = path.read_text(encoding="utf-8").splitlines()
+            self.assertEqual(len(lines), 1)
+            stack, count = lines[0].rsplit(" ", 1)
+            self.assertIn("test_write_collapsed_emits_stack_and_count", stack)
+            self.assertEqual(count, "2")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import dataclasses
+import math
+import unittest
+
+from aivp.config.models import AgentConfig
+from aivp.runtime.registry import compile_agents
+
+
+def _agent(agent_id: str, every_minutes: int = 10, **overrides: object) -> AgentConfig:
+    payload: dict[str, object] = {
+        "id": agent_id,
+        "name": f"VP {agent_id}",
+        "trigger": {"type": "schedule", "every_minutes": every_minutes},
+        "steps": [
+            {"id": "fetch_input", "skill": "gmail.fetch"},
+            {"id": "report", "skill": "telegram.post"},
+        ],
+    }
+    payload.update(overrides)
+    return AgentConfig.model_validate(payload)
+
+
+class CompileAgentsTests(unittest.TestCase):
+    def test_records_are_slotted_and_frozen(self) -> None:
+        registry = compile_agents([_agent("vp-a")], now=0.0)
+        record = registry[0]
+
+        self.assertFalse(hasattr(record, "__dict__"))
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            record.id = "other"  # type: ignore[misc]
+
+    def test_identical_steps_are_shared(self) -> None:
+        registry = compile_agents([_agent("vp-a"), _agent("vp-b")], now=0.0)
+
+        self.assertIs(registry[0].steps[0], registry[1].steps[0])
+        self.assertEqual(registry[0].steps[1].skill, "telegram.post")
+
+    def test_profiling_and_includes_are_carried_and_shared(self) -> None:
+        registry = compile_agents(
+            [
+                _agent("vp-a", profiling={"enabled": True, "slow_run_seconds": 5}),
+                _agent("vp-b", profiling={"enabled": True, "slow_run_seconds": 5}),
+                _agent("vp-c", includes=["common.yaml"]),
+            ],
+            now=0.0,
+        )
+
+        self.assertTrue(registry[0].profiling.enabled)
+        self.assertEqual(registry[0].profiling.slow_run_seconds, 5)
+        self.assertIs(registry[0].profiling, registry[1].profiling)
+        self.assertFalse(registry[2].profiling.enabled)
+        self.assertEqual(registry[2].includes, ("common.yaml",))
+
+    def test_schedule_state_is_array_backed(self) -> None:
+        registry = compile_agents(
+            [_agent("vp-a", every_minutes=1), _agent("vp-b", every_minutes=5)],
+            now=100.0,
+        )
+
+        self.assertEqual(registry.intervals.typecode, "d")
+        self.assertEqual(list(registry.intervals), [60.0, 300.0])
+        self.assertEqual(list(registry.next_fire), [160.0, 400.0])
+
+    def test_event_triggered_agents_are_never_due(self) -> None:
+        registry = compile_agents(
+            [_agent("vp-a", trigger={"type": "event"})],
+            now=0.0,
+        )
+
+        self.assertTrue(math.isinf(registry.next_fire[0]))
+        self.assertEqual(registry.due(1e12), [])
+
+    def test_due_and_mark_fired(self) -> None:
+        registry = compile_agents(
+            [_agent("vp-a", every_minutes=1), _agent("vp-b", every_minutes=5)],
+            now=0.0,
+        )
+
+        self.assertEqual(registry.due(60.0), [0])
+
+        registry.mark_fired(registry.index_of("vp-a"), now=60.0)
+
+        self.assertEqual(registry.next_fire[0], 120.0)
+        self.assertEqual(registry.due(300.0), [0, 1])
+
+    def test_duplicate_ids_are_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            compile_agents([_agent("vp-a"), _agent("vp-a")], now=0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
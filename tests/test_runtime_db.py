@@ -6,8 +6,11 @@ import unittest
 from pathlib import Path
 
 from aivp.runtime.db import (
+    RunTrace,
     bootstrap_sqlite,
     get_migration_version,
+    get_run_trace,
+    record_run_trace,
     set_migration_version,
 )
 
@@ -63,5 +66,31 @@ class RuntimeDbBootstrapTests(unittest.TestCase):
             self.assertIsNone(version)
 
 
+class RunTraceTests(unittest.TestCase):
+    def test_record_run_trace_round_trips(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / "runtime" / "db" / "aivp.sqlite3"
+            trace = RunTrace(
+                run_id="run-1",
+                agent_id="vp-example",
+                started_at="2026-01-01T00:00:00+00:00",
+                duration_seconds=4.5,
+                status="succeeded",
+                profile_artifact="runtime/artifacts/profiles/vp-example/run-1",
+            )
+
+            record_run_trace(db_path, trace)
+
+            self.assertEqual(get_run_trace(db_path, "run-1"), trace)
+            self.assertIsNone(get_run_trace(db_path, "missing"))
+
+    def test_get_run_trace_returns_none_when_table_missing(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / "runtime" / "db" / "aivp.sqlite3"
+            bootstrap_sqlite(db_path)
+
+            self.assertIsNone(get_run_trace(db_path, "run-1"))
+
+
 if __name__ == "__main__":
     unittest.main()
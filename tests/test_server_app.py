@@ -5,7 +5,12 @@ import tempfile
 import unittest
 from pathlib import Path
 
-from aivp.server.app import ServerConfig, build_server_summary
+from aivp.runtime.metrics import MetricsRegistry, write_textfile
+from aivp.server.app import (
+    ServerConfig,
+    build_metrics_response,
+    build_server_summary,
+)
 
 
 class BuildServerSummaryTests(unittest.TestCase):
@@ -27,6 +32,93 @@ class BuildServerSummaryTests(unittest.TestCase):
                 summary["db_path"], str(root / "runtime" / "db" / "aivp.sqlite3")
             )
 
+    def test_summary_includes_published_metrics(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            metrics_file = root / "runtime" / "daemon.metrics.prom"
+            metrics_file.parent.mkdir(parents=True)
+            metrics_file.write_text(
+                "# TYPE aivp_queue_depth gauge\naivp_queue_depth 4\n",
+                encoding="utf-8",
+            )
+            config = ServerConfig(
+                root_dir=root,
+                db_path=root / "runtime" / "db" / "aivp.sqlite3",
+                artifacts_dir=root / "runtime" / "artifacts",
+                backups_dir=root / "runtime" / "backups",
+                metrics_file=metrics_file,
+            )
+
+            summary = build_server_summary(config, include_metrics=True)
+
+            json.dumps(summary)
+            self.assertEqual(
+                summary["metrics"],
+                {
+                    "available": True,
+                    "samples": {"aivp_queue_depth": 4.0},
+                    "shards": {},
+                },
+            )
+
+    def test_summary_includes_shard_metrics_files(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            runtime = root / "runtime"
+            runtime.mkdir()
+            for shard_id, beats in (("shard-0", 3), ("shard-1", 5)):
+                (runtime / f"daemon-{shard_id}.metrics.prom").write_text(
+                    f"aivp_daemon_heartbeats_total {beats}\n", encoding="utf-8"
+                )
+            config = ServerConfig(
+                root_dir=root,
+                db_path=runtime / "db" / "aivp.sqlite3",
+                artifacts_dir=runtime / "artifacts",
+                backups_dir=runtime / "backups",
+                metrics_file=runtime / "daemon.metrics.prom",
+            )
+
+            metrics = build_server_summary(config, include_metrics=True)["metrics"]
+
+            self.assertTrue(metrics["available"])
+            self.assertEqual(metrics["samples"], {})
+            self.assertEqual(
+                metrics["shards"],
+                {
+                    "shard-0": {"aivp_daemon_heartbeats_total": 3.0},
+                    "shard-1": {"aivp_daemon_heartbeats_total": 5.0},
+                },
+            )
+
+
+class BuildMetricsResponseTests(unittest.TestCase):
+    def _config(self, root: Path) -> ServerConfig:
+        return ServerConfig(
+            root_dir=root,
+            db_path=root / "runtime" / "db" / "aivp.sqlite3",
+            artifacts_dir=root / "runtime" / "artifacts",
+            backups_dir=root / "runtime" / "backups",
+            metrics_file=root / "runtime" / "daemon.metrics.prom",
+        )
+
+    def test_response_serves_published_metrics_file(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config = self._config(Path(tmpdir))
+            registry = MetricsRegistry()
+            registry.counter("events_total", "Events.").inc()
+            write_textfile(registry, config.metrics_file)
+
+            content_type, body = build_metrics_response(config)
+
+            self.assertTrue(content_type.startswith("text/plain; version=0.0.4"))
+            self.assertIn("events_total 1\n", body)
+
+    def test_response_is_empty_before_first_publish(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            _, body = build_metrics_response(self._config(Path(tmpdir)))
+
+            self.assertEqual(body, "")
+
 
 if __name__ == "__main__":
     unittest.main()
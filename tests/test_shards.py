@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from aivp.runtime.daemon import DaemonRunner
+from aivp.runtime.db import bootstrap_sqlite
+from aivp.runtime.shards import (
+    HashRing,
+    LeaseStore,
+    LeaseStoreError,
+    ShardMember,
+    ShardSupervisor,
+    shard_path,
+)
+
+AGENT_IDS = [f"vp-{i}" for i in range(200)]
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _store(root: Path, lease_seconds: float) -> LeaseStore:
+    db_path = root / "aivp.sqlite3"
+    bootstrap_sqlite(db_path)
+    return LeaseStore(db_path, lease_seconds=lease_seconds)
+
+
+class HashRingTests(unittest.TestCase):
+    def test_every_shard_gets_a_share(self) -> None:
+        ring = HashRing(["shard-0", "shard-1", "shard-2"])
+
+        owners = [ring.owner(agent_id) for agent_id in AGENT_IDS]
+
+        for shard_id in ("shard-0", "shard-1", "shard-2"):
+            self.assertGreater(owners.count(shard_id), 30)
+
+    def test_removing_a_shard_only_moves_its_agents(self) -> None:
+        before = HashRing(["shard-0", "shard-1", "shard-2"])
+        after = HashRing(["shard-0", "shard-1"])
+
+        for agent_id in AGENT_IDS:
+            if before.owner(agent_id) != "shard-2":
+                self.assertEqual(after.owner(agent_id), before.owner(agent_id))
+
+    def test_empty_ring_is_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            HashRing([])
+
+
+class LeaseStoreTests(unittest.TestCase):
+    def test_live_lease_blocks_other_shards_until_expiry(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = _store(Path(tmpdir), lease_seconds=10)
+
+            self.assertEqual(store.claim("shard-0", ["vp-a"], now=0), {"vp-a"})
+            self.assertEqual(store.claim("shard-1", ["vp-a"], now=5), set())
+            self.assertEqual(store.claim("shard-1", ["vp-a"], now=10), {"vp-a"})
+            self.assertEqual(store.claim("shard-0", ["vp-a"], now=11), set())
+
+    def test_release_all_drops_leases_and_heartbeat(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = _store(Path(tmpdir), lease_seconds=10)
+            store.heartbeat("shard-0", now=0)
+            store.claim("shard-0", ["vp-a", "vp-b"], now=0)
+
+            store.release("shard-0")
+
+            self.assertEqual(store.live_shards(now=1), [])
+            self.assertEqual(store.claim("shard-1", ["vp-a"], now=1), {"vp-a"})
+
+    def test_uninitialized_db_is_refused(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / "aivp.sqlite3"
+
+            with self.assertRaises(LeaseStoreError):
+                LeaseStore(db_path)
+
+            self.assertFalse(db_path.exists())
+
+
+class ShardMemberTests(unittest.TestCase):
+    def test_shards_partition_agents_and_take_over_after_crash(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = _store(Path(tmpdir), lease_seconds=30)
+            clock = FakeClock()
+            members = [
+                ShardMember(store, f"shard-{i}", AGENT_IDS, clock=clock)
+                for i in range(3)
+            ]
+
+            # first round: earlier members briefly claim extra agents
+            for _ in range(2):
+                for member in members:
+                    member.tick()
+                clock.now += 5
+            for member in members:
+                member.tick()
+
+            owned = [member.owned for member in members]
+            self.assertEqual(set().union(*owned), set(AGENT_IDS))
+            self.assertEqual(sum(len(agents) for agents in owned), len(AGENT_IDS))
+
+            # shard-2 crashes: no more ticks and no release
+            crashed = members.pop()
+            clock.now += 10
+            for member in members:
+                member.tick()
+            self.assertTrue(crashed.owned.isdisjoint(members[0].owned))
+
+            clock.now += 30
+            for member in members:
+                member.tick()
+
+            survivors = members[0].owned | members[1].owned
+            self.assertEqual(survivors, set(AGENT_IDS))
+
+    def test_leave_hands_agents_to_remaining_shard(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = _store(Path(tmpdir), lease_seconds=30)
+            clock = FakeClock()
+            first = ShardMember(store, "shard-0", AGENT_IDS, clock=clock)
+            second = ShardMember(store, "shard-1", AGENT_IDS, clock=clock)
+            first.tick()
+            second.tick()
+
+            first.leave()
+            clock.now += 1
+
+            self.assertEqual(second.tick(), set(AGENT_IDS))
+
+    def test_failing_tick_still_releases_leases(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            store = _store(root, lease_seconds=30)
+            member = ShardMember(store, "shard-0", AGENT_IDS)
+            ticks = 0
+
+            def _tick() -> None:
+                nonlocal ticks
+                ticks += 1
+                if ticks > 1:
+                    raise sqlite3.OperationalError("database is locked")
+                member.tick()
+
+            pid_file = root / "daemon-shard-0.pid"
+            runner = DaemonRunner(pid_file, on_heartbeat=_tick, on_stop=member.leave)
+
+            with self.assertRaises(sqlite3.OperationalError):
+                runner.start(heartbeat_seconds=0.01)
+
+            self.assertEqual(_count(store.db_path, "agent_leases"), 0)
+            self.assertEqual(store.live_shards(now=time.time()), [])
+            self.assertFalse(pid_file.exists())
+
+
+class ShardSupervisorTests(unittest.TestCase):
+    def test_shard_path_suffixes_stem(self) -> None:
+        self.assertEqual(
+            shard_path(Path("runtime/daemon.pid"), "shard-1"),
+            Path("runtime/daemon-shard-1.pid"),
+        )
+        self.assertEqual(
+            shard_path(Path("runtime/daemon.metrics.prom"), "shard-1"),
+            Path("runtime/daemon-shard-1.metrics.prom"),
+        )
+
+    def test_exited_shards_are_restarted(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            pid_file = Path(tmpdir) / "daemon.pid"
+            supervisor = ShardSupervisor(
+                pid_file,
+                ["shard-0", "shard-1"],
+                lambda _shard_id: [sys.executable, "-c", "pass"],
+                poll_seconds=0.2,
+                restart_backoff_seconds=0.1,
+            )
+
+            result = supervisor.run(max_polls=3)
+
+            self.assertEqual(result.status, "started")
+            self.assertGreaterEqual(supervisor.restarts, 2)
+            self.assertFalse(pid_file.exists())
+
+    def test_crashing_shards_back_off_before_restart(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            supervisor = ShardSupervisor(
+                Path(tmpdir) / "daemon.pid",
+                ["shard-0"],
+                lambda _shard_id: [sys.executable, "-c", "pass"],
+                poll_seconds=0.1,
+                restart_backoff_seconds=0.25,
+                max_backoff_seconds=10.0,
+            )
+
+            supervisor.run(max_polls=10)
+
+            # restarts after ~0.25s and ~0.75s; without backoff nearly every poll
+            self.assertIn(supervisor.restarts, (1, 2, 3))
+            self.assertEqual(supervisor._backoff(3), 1.0)
+            self.assertEqual(supervisor._backoff(20), 10.0)
+
+    def test_supervisor_blocked_by_active_pid_lock(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            pid_file = Path(tmpdir) / "daemon.pid"
+            pid_file.write_text(str(os.getpid()), encoding="utf-8")
+
+            result = ShardSupervisor(
+                pid_file, ["shard-0"], lambda _shard_id: [sys.executable, "-c", ""]
+            ).run(max_polls=0)
+
+            self.assertEqual(result.status, "already_running")
+
+
+class SupervisedShardStopTests(unittest.TestCase):
+    def test_stopping_supervisor_releases_shard_leases(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            agents_dir = root / "agents"
+            agents_dir.mkdir()
+            for i in range(4):
+                (agents_dir / f"vp-{i}.yaml").write_text(
+                    f"id: vp-{i}\n"
+                    f"name: VP {i}\n"
+                    "trigger:\n  type: schedule\n  every_minutes: 10\n",
+                    encoding="utf-8",
+                )
+            pid_file = root / "daemon.pid"
+            db_path = root / "aivp.sqlite3"
+            bootstrap_sqlite(db_path)
+            supervisor = subprocess.Popen(
+                [
+                    sys.executable,
+                    "-m",
+                    "aivp.cli",
+                    "daemon",
+                    "supervise",
+                    "--shards",
+                    "2",
+                    "--pid-file",
+                    str(pid_file),
+                    "--metrics-file",
+                    str(root / "daemon.metrics.prom"),
+                    "--agents-dir",
+                    str(agents_dir),
+                    "--db-path",
+                    str(db_path),
+                    "--heartbeat-seconds",
+                    "30",
+                    "--lease-seconds",
+                    "90",
+                ],
+                stdout=subprocess.DEVNULL,
+            )
+            try:
+                deadline = time.monotonic() + 20.0
+                leased = 0
+                while leased < 4 and time.monotonic() < deadline:
+                    time.sleep(0.1)
+                    if db_path.exists():
+                        leased = _count(db_path, "agent_leases")
+                self.assertEqual(leased, 4)
+
+                # what `aivp daemon stop` sends; the shards' SIGKILL timeout is 10s
+                supervisor.terminate()
+                self.assertEqual(supervisor.wait(timeout=8.0), 0)
+
+                self.assertFalse(pid_file.exists())
+                self.assertEqual(_count(db_path, "agent_leases"), 0)
+                self.assertEqual(_count(db_path, "shard_heartbeats"), 0)
+                self.assertFalse(shard_path(pid_file, "shard-0").exists())
+                self.assertFalse(shard_path(pid_file, "shard-1").exists())
+            finally:
+                if supervisor.poll() is None:
+                    supervisor.kill()
+                supervisor.wait()
+
+
+def _count(db_path: Path, table: str) -> int:
+    with sqlite3.connect(db_path) as conn:
+        try:
+            return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        except sqlite3.OperationalError:
+            return 0
+
+
+if __name__ == "__main__":
+    unittest.main()
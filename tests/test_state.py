@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from aivp.runtime.state import AgentStateStore
+
+
+class AgentStateStoreTests(unittest.TestCase):
+    def test_values_are_scoped_by_agent(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = AgentStateStore(Path(tmpdir) / "aivp.sqlite3")
+
+            store.write("vp-a", {"cursor": 1, "seen": ["x"]})
+            store.write("vp-b", {"cursor": 2})
+
+            self.assertEqual(store.load("vp-a"), {"cursor": 1, "seen": ["x"]})
+            self.assertEqual(store.load("vp-b", ["cursor", "seen"]), {"cursor": 2})
+
+    def test_large_values_are_stored_compressed(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / "aivp.sqlite3"
+            store = AgentStateStore(db_path, compress_threshold=64)
+            big = {"rows": ["expense"] * 200}
+
+            store.write("vp-a", {"big": big, "small": 1})
+
+            with sqlite3.connect(db_path) as conn:
+                flags = dict(conn.execute("SELECT key, compressed FROM agent_state"))
+            self.assertEqual(flags, {"big": 1, "small": 0})
+            self.assertEqual(store.load("vp-a", ["big"]), {"big": big})
+
+
+class StateCacheTests(unittest.TestCase):
+    def test_prefetch_loads_working_set_in_one_query(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = AgentStateStore(Path(tmpdir) / "aivp.sqlite3")
+            store.write("vp-a", {"a": 1, "b": 2})
+            cache = store.cache("vp-a")
+
+            with patch.object(store, "load", wraps=store.load) as load_mock:
+                cache.prefetch()
+                values = (cache.get("a"), cache.get("b"), cache.get("missing", 0))
+
+            self.assertEqual(values, (1, 2, 0))
+            load_mock.assert_called_once_with("vp-a")
+
+    def test_changes_are_written_back_on_flush_only(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = AgentStateStore(Path(tmpdir) / "aivp.sqlite3")
+            store.write("vp-a", {"old": True, "keep": 1})
+            cache = store.cache("vp-a")
+
+            cache.set("new", {"n": 1})
+            cache.delete("old")
+
+            self.assertTrue(cache.dirty)
+            self.assertEqual(store.load("vp-a"), {"old": True, "keep": 1})
+
+            with patch.object(store, "write", wraps=store.write) as write_mock:
+                self.assertEqual(cache.flush(), 2)
+                self.assertEqual(cache.flush(), 0)
+
+            write_mock.assert_called_once()
+            self.assertEqual(store.load("vp-a"), {"keep": 1, "new": {"n": 1}})
+
+    def test_prefetch_does_not_clobber_local_changes(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = AgentStateStore(Path(tmpdir) / "aivp.sqlite3")
+            store.write("vp-a", {"a": 1, "b": 2})
+            cache = store.cache("vp-a")
+
+            cache.set("a", 10)
+            cache.delete("b")
+            cache.prefetch()
+
+            self.assertEqual(cache.get("a"), 10)
+            self.assertIsNone(cache.get("b"))
+
+    def test_context_manager_discards_changes_on_error(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = AgentStateStore(Path(tmpdir) / "aivp.sqlite3")
+
+            with store.cache("vp-a") as cache:
+                cache.set("ok", 1)
+
+            with self.assertRaises(RuntimeError), store.cache("vp-a") as cache:
+                cache.set("lost", 1)
+                raise RuntimeError("step failed")
+
+            self.assertEqual(store.load("vp-a"), {"ok": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
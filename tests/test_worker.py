@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import sqlite3
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from aivp.config.models import AgentConfig
+from aivp.runtime.db import get_run_trace
+from aivp.runtime.registry import compile_agents
+from aivp.runtime.state import AgentStateStore, StateCache
+from aivp.runtime.worker import execute_run, profile_artifact_path
+
+
+def _agent(**profiling: object) -> AgentConfig:
+    return AgentConfig(
+        id="vp-example",
+        name="VP of Example Task",
+        trigger={"type": "schedule", "every_minutes": 10},
+        profiling=profiling,
+    )
+
+
+class ExecuteRunTests(unittest.TestCase):
+    def test_successful_run_records_trace_without_profile(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            db_path = root / "db" / "aivp.sqlite3"
+
+            trace = execute_run(_agent(), "run-1", lambda: None, root, db_path)
+
+            self.assertEqual(trace.status, "succeeded")
+            self.assertIsNone(trace.profile_artifact)
+            self.assertEqual(get_run_trace(db_path, "run-1"), trace)
+
+    def test_slow_profiled_run_links_collapsed_stack_artifact(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            db_path = root / "db" / "aivp.sqlite3"
+            agent = _agent(enabled=True, slow_run_seconds=0.05, sample_interval_ms=1)
+
+            trace = execute_run(agent, "run-2", lambda: time.sleep(0.1), root, db_path)
+
+            expected = profile_artifact_path(root, "vp-example", "run-2")
+            self.assertEqual(trace.profile_artifact, str(expected))
+            self.assertTrue(expected.read_text(encoding="utf-8").strip())
+            self.assertEqual(
+                get_run_trace(db_path, "run-2").profile_artifact, str(expected)
+            )
+
+    def test_compiled_record_runs_with_profiling(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            db_path = root / "db" / "aivp.sqlite3"
+            agent = _agent(enabled=True, slow_run_seconds=0.05, sample_interval_ms=1)
+            record = compile_agents([agent], now=0.0)[0]
+
+            trace = execute_run(record, "run-7", lambda: time.sleep(0.1), root, db_path)
+
+            self.assertEqual(trace.agent_id, "vp-example")
+            self.assertIsNotNone(trace.profile_artifact)
+
+    def test_fast_profiled_run_skips_artifact(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            db_path = root / "db" / "aivp.sqlite3"
+            agent = _agent(enabled=True, slow_run_seconds=60)
+
+            trace = execute_run(agent, "run-3", lambda: None, root, db_path)
+
+            self.assertIsNone(trace.profile_artifact)
+            self.assertFalse((root / "profiles").exists())
+
+    def test_failed_run_is_recorded_and_reraised(self) -> None:
+        def _fail() -> None:
+            raise ValueError("boom")
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            db_path = root / "db" / "aivp.sqlite3"
+
+            with self.assertRaises(ValueError):
+                execute_run(_agent(), "run-4", _fail, root, db_path)
+
+            self.assertEqual(get_run_trace(db_path, "run-4").status, "failed")
+
+    def test_profile_path_outside_artifacts_dir_is_rejected(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            agent = _agent(enabled=True, slow_run_seconds=0.01)
+            agent = agent.model_copy(update={"id": "../../escape"})
+
+            with self.assertRaises(ValueError):
+                execute_run(agent, "run-5", lambda: None, root, root / "db.sqlite3")
+
+            self.assertFalse((root.parent / "escape").exists())
+            with self.assertRaises(ValueError):
+                profile_artifact_path(root, "vp-example", "../run")
+
+    def test_trace_failure_does_not_mask_run_error(self) -> None:
+        def _fail() -> None:
+            raise ValueError("boom")
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+
+            with patch(
+                "aivp.runtime.worker.record_run_trace",
+                side_effect=sqlite3.OperationalError("database is locked"),
+            ):
+                with self.assertRaises(ValueError) as caught:
+                    execute_run(_agent(), "run-6", _fail, root, root / "db.sqlite3")
+
+            self.assertIn("database is locked", caught.exception.__notes__[0])
+
+    def test_state_cache_is_flushed_after_successful_run(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            db_path = root / "db" / "aivp.sqlite3"
+            store = AgentStateStore(db_path)
+            store.write("vp-example", {"runs": 1, "stale": True})
+
+            def body(cache: StateCache) -> None:
+                cache.set("runs", cache.get("runs") + 1)
+                cache.delete("stale")
+
+            execute_run(_agent(), "run-8", body, root, db_path, state_store=store)
+
+            self.assertEqual(store.load("vp-example"), {"runs": 2})
+
+    def test_state_cache_is_discarded_after_failed_run(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = Path(tmpdir)
+            db_path = root / "db" / "aivp.sqlite3"
+            store = AgentStateStore(db_path)
+            store.write("vp-example", {"runs": 1})
+
+            def body(cache: StateCache) -> None:
+                cache.set("runs", 2)
+                raise RuntimeError("boom")
+
+            with self.assertRaises(RuntimeError):
+                execute_run(_agent(), "run-9", body, root, db_path, state_store=store)
+
+            self.assertEqual(store.load("vp-example"), {"runs": 1})
+            self.assertEqual(get_run_trace(db_path, "run-9").status, "failed")
+
+
+if __name__ == "__main__":
+    unittest.main()